@@ -0,0 +1,411 @@
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from multiprocessing import Pool, cpu_count, current_process
+from typing import Callable, Optional
+
+from game.board import PLAYER_X, Board
+
+# Torneio entre dois motores: os jogos são distribuídos por um pool de processos,
+# cada par de jogos usa a mesma semente com as cores trocadas, e o torneio pode
+# parar cedo (SPRT ou intervalo de confiança) quando o resultado já é claro.
+
+
+class Player:
+    # Interface dos motores do torneio. Os objetos pesados (modelos, árvores,
+    # pools) são criados no primeiro uso, já dentro do processo que joga.
+    name = "player"
+    # O motor cria processos filhos (não pode, dentro de um processo do pool)
+    spawns_processes = False
+
+    # Chamado no início de cada jogo
+    def new_game(self):
+        pass
+
+    def move(self, board: Board) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class RandomPlayer(Player):
+    # Joga uma coluna válida ao acaso (a semente é a do jogo)
+    name = "random"
+
+    def move(self, board: Board) -> int:
+        return random.choice(board.valid_moves())
+
+
+class MCTSPlayer(Player):
+    # MCTS com uma SearchSession por jogo (a árvore é reaproveitada entre jogadas).
+    # `options` são os parâmetros de ai.mcts.MCTS; `book_path` é o livro de aberturas.
+    # Os processos do pool do torneio são daemon e não podem ter filhos: lá, o modo
+    # paralelo "root" (processos) corre com workers=1 e o paralelismo vem do torneio.
+    def __init__(self, name: Optional[str] = None, book_path: Optional[str] = None, **options):
+        self.options = options
+        self.book_path = book_path
+        self.name = name or "mcts(" + ",".join(f"{k}={v}" for k, v in sorted(options.items())) + ")"
+        self._session = None
+
+    @property
+    def spawns_processes(self) -> bool:
+        return self.options.get("workers", 1) > 1 and self.options.get("parallel", "root") == "root"
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_session"] = None
+        return state
+
+    def new_game(self):
+        if self._session is None:
+            from ai.book import load_book
+            from ai.mcts import MCTS, SearchSession
+            book = load_book(self.book_path) if self.book_path else None
+            options = self.options
+            if self.spawns_processes and current_process().daemon:
+                options = {**options, "workers": 1}
+            self._session = SearchSession(MCTS(book=book, **options))
+        self._session.reset()
+
+    def move(self, board: Board) -> int:
+        return self._session.best_move(board)
+
+    def close(self):
+        if self._session is not None:
+            self._session.engine.close()
+            self._session = None
+
+
+class ID3Player(Player):
+    # Modelo ID3 compilado, carregado por id3.load_model (id3_model.bin ou, se não
+    # existir, o pickle com o mesmo nome, compilado ao carregar)
+    def __init__(self, path: str = "id3_model.bin", name: str = "id3"):
+        self.path = path
+        self.name = name
+        self._model = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_model"] = None
+        return state
+
+    def new_game(self):
+        if self._model is None:
+            from id3 import load_model
+            self._model = load_model(self.path)
+
+    def move(self, board: Board) -> int:
+        return self._model.predict_move(board)
+
+
+class SolverPlayer(Player):
+    # Solver exato de ai.solver com limite de tempo por jogada (sem solução exata,
+    # joga a melhor jogada da última profundidade completa)
+    def __init__(self, time_limit: Optional[float] = 1.0, name: Optional[str] = None):
+        self.time_limit = time_limit
+        self.name = name or f"solver(time_limit={time_limit})"
+        self._solver = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_solver"] = None
+        return state
+
+    def new_game(self):
+        if self._solver is None:
+            from ai.solver import Solver
+            self._solver = Solver()
+
+    def move(self, board: Board) -> int:
+        return self._solver.solve(board, self.time_limit).move
+
+
+# Tipos de motor da linha de comandos (parse_player)
+PLAYERS: dict[str, Callable[..., Player]] = {
+    "random": RandomPlayer,
+    "mcts": MCTSPlayer,
+    "id3": ID3Player,
+    "solver": SolverPlayer,
+}
+
+
+def _parse_value(text: str):
+    if text in ("None", "none"):
+        return None
+    if text in ("True", "true", "False", "false"):
+        return text.lower() == "true"
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_player(spec: str) -> Player:
+    """
+    Cria um motor a partir de "tipo" ou "tipo:chave=valor,chave=valor",
+    por exemplo "mcts:iterations=300,max_children=4" ou "id3:path=id3_model.bin".
+    """
+    kind, _, args = spec.partition(":")
+    if kind not in PLAYERS:
+        raise ValueError(f"Motor desconhecido: {kind!r} (opções: {', '.join(PLAYERS)})")
+    options = {}
+    for item in filter(None, args.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Opção sem valor em {spec!r}: {item!r}")
+        options[key.strip()] = _parse_value(value.strip())
+    return PLAYERS[kind](**options)
+
+
+# ---------------------------------------------------------------- estatística
+
+def elo_from_score(score: float) -> float:
+    # Diferença de Elo correspondente a uma pontuação esperada (0..1)
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def score_from_elo(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+# Pontuação média e variância por jogo (modelo trinomial: vitória 1, empate 0.5, derrota 0)
+def _score_stats(wins: int, draws: int, losses: int) -> tuple[float, float]:
+    n = wins + draws + losses
+    score = (wins + draws / 2) / n
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / n
+    return score, variance
+
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """
+    Log-verosimilhança de H1 (diferença de Elo = elo1) contra H0 (= elo0), na
+    aproximação normal do SPRT generalizado usada nos testes de motores de xadrez.
+    """
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0
+    score, variance = _score_stats(wins, draws, losses)
+    if variance == 0:
+        # Resultados todos iguais (ex.: só vitórias): a variância vem de um empate fictício
+        _, variance = _score_stats(wins, draws + 1, losses)
+    s0, s1 = score_from_elo(elo0), score_from_elo(elo1)
+    return n * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+@dataclass
+class ArenaResult:
+    # Resultado do torneio, do ponto de vista do primeiro motor (A)
+    player_a: str
+    player_b: str
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    moves: int = 0              # jogadas feitas pelos dois motores
+    elapsed: float = 0.0        # tempo de relógio do torneio, em segundos
+    stop_reason: str = ""       # "games", "sprt-h0", "sprt-h1" ou "ci"
+    llr: float = 0.0            # log-verosimilhança do SPRT (0 sem SPRT)
+    confidence: float = 0.95
+    # Tempo a pensar e jogadas de cada motor, pela ordem (A, B), somados sobre todos os processos
+    think_time: list = field(default_factory=lambda: [0.0, 0.0])
+    think_moves: list = field(default_factory=lambda: [0, 0])
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    @property
+    def score(self) -> float:
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.5
+
+    @property
+    def elo(self) -> float:
+        return elo_from_score(self.score)
+
+    # Intervalo de confiança da diferença de Elo (aproximação normal)
+    @property
+    def elo_interval(self) -> tuple[float, float]:
+        if not self.games:
+            return -math.inf, math.inf
+        score, variance = _score_stats(self.wins, self.draws, self.losses)
+        margin = _z(self.confidence) * math.sqrt(variance / self.games)
+        return elo_from_score(score - margin), elo_from_score(score + margin)
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        low, high = self.elo_interval
+        lines = [
+            f"{self.player_a} vs {self.player_b}: {self.games} jogos, "
+            f"V/E/D {self.wins}/{self.draws}/{self.losses} (pontuação {self.score:.3f})",
+            f"Elo {self.elo:+.1f} [{low:+.1f}, {high:+.1f}] ({self.confidence:.0%})"
+            + (f", LLR {self.llr:.2f}" if self.llr else "") + f", paragem: {self.stop_reason}",
+            f"{self.moves} jogadas em {self.elapsed:.1f} s ({self.moves_per_second:.1f} jogadas/s)",
+        ]
+        for name, moves, seconds in zip((self.player_a, self.player_b), self.think_moves, self.think_time):
+            if seconds:
+                lines.append(f"  {name}: {moves / seconds:.1f} jogadas/s a pensar")
+        return "\n".join(lines)
+
+
+# Quantil da normal padrão para um intervalo bilateral (inversa de erf por bisseção)
+def _z(confidence: float) -> float:
+    target = (1 + confidence) / 2
+    low, high = 0.0, 10.0
+    for _ in range(60):
+        mid = (low + high) / 2
+        if 0.5 * (1 + math.erf(mid / math.sqrt(2))) < target:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+# ---------------------------------------------------------------- jogos
+
+# Motores de cada processo (criados uma vez pelo initializer do pool)
+_players: Optional[tuple[Player, Player]] = None
+
+
+def _init_worker(player_a: Player, player_b: Player):
+    global _players
+    _players = (player_a, player_b)
+
+
+# Joga o jogo `index`. Os jogos 2k e 2k + 1 usam a mesma semente com as cores
+# trocadas: A joga com X nos jogos pares e com O nos ímpares.
+# Devolve (índice, pontos de A, jogadas e tempo de cada motor)
+def play_game(task: tuple[int, int]) -> tuple[int, float, list[int], list[float]]:
+    index, seed = task
+    random.seed(f"{seed}:{index // 2}")
+    a, b = _players
+    a_is_x = index % 2 == 0
+    players = (a, b) if a_is_x else (b, a)
+    for player in players:
+        player.new_game()
+
+    board = Board()
+    moves = [0, 0]
+    think = [0.0, 0.0]
+    while not board.is_game_over():
+        turn = 0 if board.current_player == PLAYER_X else 1
+        start = time.perf_counter()
+        move = players[turn].move(board)
+        think[turn] += time.perf_counter() - start
+        moves[turn] += 1
+        board.apply_move(move)
+
+    winner = board.get_winner()
+    if winner is None:
+        points = 0.5
+    else:
+        points = 1.0 if (winner == PLAYER_X) == a_is_x else 0.0
+    # Estatísticas pela ordem (A, B)
+    if not a_is_x:
+        moves.reverse()
+        think.reverse()
+    return index, points, moves, think
+
+
+def run_match(
+    player_a: Player,
+    player_b: Player,
+    games: int = 100,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    stop: Optional[str] = "sprt",
+    elo0: float = 0.0,
+    elo1: float = 50.0,
+    alpha: float = 0.05,
+    beta: float = 0.05,
+    confidence: float = 0.95,
+    min_games: int = 10,
+    progress: Optional[Callable[[ArenaResult], None]] = None
+) -> ArenaResult:
+    """
+    Joga até `games` jogos entre dois motores, com as cores alternadas.
+
+    :param workers: número de processos (None = todos os núcleos; 1 = no próprio processo)
+    :param seed: semente base; o par de jogos k usa sempre a mesma semente derivada dela
+    :param stop: paragem antecipada: "sprt" (H0: Elo = elo0 contra H1: Elo = elo1,
+                 com erros alpha e beta), "ci" (quando o intervalo de confiança do
+                 Elo deixa de conter 0) ou None (joga sempre todos os jogos)
+    :param min_games: jogos mínimos antes de a paragem antecipada ser considerada
+    :param progress: chamado com o resultado parcial depois de cada jogo
+    :return: resultado do ponto de vista de player_a
+    """
+    if stop not in ("sprt", "ci", None):
+        raise ValueError(f"Regra de paragem desconhecida: {stop!r}")
+    result = ArenaResult(str(player_a), str(player_b), confidence=confidence)
+    lower, upper = math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+    tasks = [(i, seed) for i in range(games)]
+    n_processes = workers or cpu_count()
+
+    start = time.perf_counter()
+    pool = None
+    if n_processes > 1:
+        for player in (player_a, player_b):
+            if player.spawns_processes:
+                print(f"Aviso: {player} joga com workers=1 nos {n_processes} processos do torneio "
+                      f"(para usar os seus processos, corra o torneio com workers=1).", file=sys.stderr)
+        pool = Pool(n_processes, initializer=_init_worker, initargs=(player_a, player_b))
+        outcomes = pool.imap(play_game, tasks, chunksize=1)
+    else:
+        _init_worker(player_a, player_b)
+        outcomes = map(play_game, tasks)
+    try:
+        # Os resultados são contados pela ordem dos jogos, para que a paragem seja
+        # reprodutível com a mesma semente, seja qual for o número de processos
+        for index, points, moves, think in outcomes:
+            if points == 1:
+                result.wins += 1
+            elif points == 0:
+                result.losses += 1
+            else:
+                result.draws += 1
+            for i in range(2):
+                result.think_moves[i] += moves[i]
+                result.think_time[i] += think[i]
+            result.moves += sum(moves)
+            result.elapsed = time.perf_counter() - start
+            if progress is not None:
+                progress(result)
+
+            if result.games < min_games:
+                continue
+            if stop == "sprt":
+                result.llr = sprt_llr(result.wins, result.draws, result.losses, elo0, elo1)
+                if result.llr >= upper:
+                    result.stop_reason = "sprt-h1"
+                elif result.llr <= lower:
+                    result.stop_reason = "sprt-h0"
+            elif stop == "ci":
+                low, high = result.elo_interval
+                if low > 0 or high < 0:
+                    result.stop_reason = "ci"
+            if result.stop_reason:
+                break
+        else:
+            result.stop_reason = "games"
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        else:
+            player_a.close()
+            player_b.close()
+    result.elapsed = time.perf_counter() - start
+    return result
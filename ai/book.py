@@ -0,0 +1,138 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Optional
+
+from game.board import BOTTOM_MASK, COLS, H1, Board
+
+# Ficheiro do livro usado por omissão (na pasta onde o jogo é lançado, como o id3_model.pkl)
+DEFAULT_PATH: str = "opening_book.bin"
+
+MAGIC: bytes = b"C4BK"
+VERSION: int = 1
+# Cabeçalho: magic, versão, nº máximo de lances das posições, nº de posições da tabela, nº de entradas
+HEADER = struct.Struct("<4sIIQQ4x")
+
+_KEY = struct.Struct("<Q")
+_COLUMN_BITS: int = (1 << H1) - 1
+_GOLDEN: int = 0x9E3779B97F4A7C15
+_MASK64: int = (1 << 64) - 1
+
+
+# Reflete um bitboard na vertical (coluna c passa a COLS - 1 - c)
+def mirror_bits(bitboard: int) -> int:
+    mirrored = 0
+    for col in range(COLS):
+        mirrored |= ((bitboard >> (col * H1)) & _COLUMN_BITS) << ((COLS - 1 - col) * H1)
+    return mirrored
+
+
+# Chave única da posição: peças do jogador da vez + todas as peças + linha de baixo.
+# Nunca é 0, por isso 0 marca as posições livres da tabela.
+def position_key(current: int, mask: int) -> int:
+    return current + mask + BOTTOM_MASK
+
+
+# Chave canónica (a menor entre a posição e o seu espelho) e se a posição é a espelhada
+def canonical_key(board: Board) -> tuple[int, bool]:
+    current = board.bitboards[board.current_player - 1]
+    mask = board.bitboards[0] | board.bitboards[1]
+    key = position_key(current, mask)
+    mirrored = position_key(mirror_bits(current), mirror_bits(mask))
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+
+# Posição inicial da sondagem linear (hash multiplicativo de Fibonacci)
+def _slot(key: int, bits: int) -> int:
+    return ((key * _GOLDEN) & _MASK64) >> (64 - bits)
+
+
+# Grava um livro a partir de {chave canónica: jogada na orientação canónica}.
+# A tabela de endereçamento aberto fica com no máximo metade das posições ocupadas.
+# O ficheiro é escrito à parte e só depois substitui o antigo.
+def write_book(path: str, entries: dict[int, int], max_plies: int):
+    slots = 8
+    while slots < 2 * len(entries):
+        slots *= 2
+    bits = slots.bit_length() - 1
+    keys = array("Q", [0]) * slots
+    moves = bytearray(slots)
+    for key, move in entries.items():
+        slot = _slot(key, bits)
+        while keys[slot] and keys[slot] != key:
+            slot = (slot + 1) & (slots - 1)
+        keys[slot] = key
+        moves[slot] = move
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_plies, slots, len(entries)))
+        if sys.byteorder == "big":
+            keys.byteswap()
+        f.write(keys.tobytes())
+        f.write(moves)
+    os.replace(tmp_path, path)
+
+
+class OpeningBook:
+    # Livro de aberturas lido por mmap: cada consulta é uma sondagem na tabela
+    # de endereçamento aberto guardada no ficheiro, sem o carregar para memória.
+    # As posições são guardadas pela chave canónica, por isso uma posição e o seu
+    # espelho partilham a entrada (a jogada é refletida ao ler).
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"{path} não é um livro de aberturas.")
+        magic, version, self.max_plies, self.slots, self.entries = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} não é um livro de aberturas.")
+        if version != VERSION:
+            raise ValueError(f"Versão do livro não suportada: {version}")
+        if len(self._mm) != HEADER.size + 9 * self.slots:
+            raise ValueError(f"{path} está truncado.")
+        self._bits = self.slots.bit_length() - 1
+        self._moves_offset = HEADER.size + 8 * self.slots
+
+    # Jogada do livro para a posição, ou None se a posição não estiver no livro
+    def lookup(self, board: Board) -> Optional[int]:
+        if board.plies > self.max_plies:
+            return None
+        key, mirrored = canonical_key(board)
+        mm, slot, last = self._mm, _slot(key, self._bits), self.slots - 1
+        while True:
+            found = _KEY.unpack_from(mm, HEADER.size + 8 * slot)[0]
+            if found == key:
+                move = mm[self._moves_offset + slot]
+                return COLS - 1 - move if mirrored else move
+            if found == 0:
+                return None
+            slot = (slot + 1) & last
+
+    def __len__(self) -> int:
+        return self.entries
+
+    def __contains__(self, board: Board) -> bool:
+        return self.lookup(board) is not None
+
+    def close(self):
+        self._mm.close()
+
+    # Os processos filhos reabrem o ficheiro em vez de copiar o mapeamento
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["path"])
+
+
+# Abre o livro se o ficheiro existir (None caso contrário)
+def load_book(path: str = DEFAULT_PATH) -> Optional[OpeningBook]:
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
@@ -1,19 +1,32 @@
+import copy
 import math
 import random
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Callable, Optional
 
-from game.board import Board
+from ai.transposition import TranspositionTable
+from ai.tree_store import TreeStore
+from game.board import Board, COLS, PLAYER_O, PLAYER_X, ROWS
+
+# O pool de processos e o solver só são importados quando são usados,
+# para que importar o MCTS seja rápido (ver python -m bench -k 'startup.*')
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from ai.solver import Solver
 
 class Node:
+    # O nó não guarda cópia do tabuleiro: a busca joga e desfaz as jogadas
+    # num único Board, e o tabuleiro só é usado aqui para listar os movimentos.
     def __init__(self, board: Board, parent: Optional["Node"] = None, move: Optional[int] = None):
-        self.board = board
         self.parent = parent
         self.move = move  # coluna (0–6) que gerou este nó
         self.children: list[Node] = []
         self.wins: float = 0.0
         self.visits: int = 0
-        # movimentos ainda não expandidos a partir deste nó
-        self.untried_moves: list[int] = board.valid_moves()
+        # movimentos ainda não expandidos a partir deste nó (nenhum se o jogo acabou)
+        self.untried_moves: list[int] = [] if board.is_game_over() else board.valid_moves()
 
     # Seleciona filho com maior valor de UCT
     def uct_select_child(self, exploration_weight: float) -> "Node":
@@ -24,30 +37,535 @@ class Node:
         )
         return best
 
+
+class TranspositionNode(Node):
+    # Nó usado no modo de transposições: as vitórias e visitas ficam numa entrada
+    # da TranspositionTable, partilhada com os outros nós da mesma posição
+    # (alcançada por outra ordem de jogadas).
+    def __init__(self, board: Board, entry: list, parent: Optional["Node"] = None, move: Optional[int] = None):
+        self.entry = entry
+        self.parent = parent
+        self.move = move
+        self.children: list[Node] = []
+        self.untried_moves: list[int] = [] if board.is_game_over() else board.valid_moves()
+
+    @property
+    def wins(self) -> float:
+        return self.entry[0]
+
+    @wins.setter
+    def wins(self, value: float):
+        self.entry[0] = value
+
+    @property
+    def visits(self) -> int:
+        return self.entry[1]
+
+    @visits.setter
+    def visits(self, value: int):
+        self.entry[1] = value
+
+
+# Visitas de cada jogada a partir da raiz (jogadas ainda não expandidas contam 0)
+def root_visits(root) -> dict[int, int]:
+    if isinstance(root, TreeStore):
+        return root.root_visits()
+    visits = {child.move: child.visits for child in root.children}
+    for move in root.untried_moves:
+        visits[move] = 0
+    return visits
+
+
+@dataclass
+class SearchStats:
+    # Perfil de uma busca (MCTS com profile=True): tempo de cada fase e contadores.
+    # Só a busca sequencial com árvore de nós é instrumentada fase a fase; nos
+    # outros modos ficam apenas as iterações, os nós e a profundidade, e os
+    # rollouts não são medidos (measured_rollouts fica a 0).
+    iterations: int = 0
+    selection_time: float = 0.0     # segundos em cada fase
+    expansion_time: float = 0.0
+    simulation_time: float = 0.0
+    backprop_time: float = 0.0
+    selection_steps: int = 0        # filhos escolhidos por UCT (soma sobre as iterações)
+    children_seen: int = 0          # filhos dos nós atravessados na seleção (para o fator de ramificação)
+    nodes_created: int = 0
+    rollouts: int = 0
+    measured_rollouts: int = 0      # rollouts com as jogadas e as sondagens contadas
+    rollout_moves: int = 0          # jogadas feitas nos rollouts
+    win_probes: int = 0             # colunas testadas por vitória imediata nos rollouts
+    win_probe_hits: int = 0         # rollouts terminados por uma vitória imediata encontrada
+    depth_sum: int = 0              # profundidade da folha de cada iteração (soma)
+    max_depth: int = 0
+
+    @property
+    def total_time(self) -> float:
+        return self.selection_time + self.expansion_time + self.simulation_time + self.backprop_time
+
+    @property
+    def mean_rollout_length(self) -> float:
+        return self.rollout_moves / self.measured_rollouts if self.measured_rollouts else 0.0
+
+    @property
+    def mean_depth(self) -> float:
+        return self.depth_sum / self.iterations if self.iterations else 0.0
+
+    @property
+    def branching_factor(self) -> float:
+        return self.children_seen / self.selection_steps if self.selection_steps else 0.0
+
+    # Junta o perfil de outra busca (workers do modo "root")
+    def merge(self, other: "SearchStats"):
+        for f in fields(self):
+            if f.name == "max_depth":
+                self.max_depth = max(self.max_depth, other.max_depth)
+            else:
+                setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+    def as_dict(self) -> dict:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data.update(
+            mean_rollout_length=self.mean_rollout_length,
+            mean_depth=self.mean_depth,
+            branching_factor=self.branching_factor,
+        )
+        return data
+
+    def summary(self) -> str:
+        total = self.total_time or 1.0
+        if self.measured_rollouts or not self.rollouts:
+            rollouts = (
+                f"rollout médio {self.mean_rollout_length:.1f} jogadas, "
+                f"sondagens de vitória {self.win_probes} ({self.win_probe_hits} com vitória)"
+            )
+        else:
+            rollouts = f"{self.rollouts} rollouts (jogadas e sondagens não medidas neste modo)"
+        phases = ", ".join(
+            f"{name} {seconds * 1000:.1f} ms ({seconds / total:.0%})"
+            for name, seconds in (
+                ("seleção", self.selection_time), ("expansão", self.expansion_time),
+                ("simulação", self.simulation_time), ("retropropagação", self.backprop_time),
+            )
+        )
+        return (
+            f"{self.iterations} iterações: {phases}\n"
+            f"nós criados {self.nodes_created}, profundidade média {self.mean_depth:.1f} (máx. {self.max_depth}), "
+            f"ramificação {self.branching_factor:.2f}, {rollouts}"
+        )
+
+
+# Callback de exemplo para profile_callback: escreve o perfil parcial no terminal
+def print_stats(stats: SearchStats):
+    print(stats.summary(), flush=True)
+
+
+@dataclass
+class SearchResult:
+    # Jogada escolhida e estatísticas da busca que a produziu
+    move: Optional[int]
+    playouts: int = 0       # rollouts feitos
+    nodes: int = 0          # nós alocados
+    depth: int = 0          # profundidade máxima atingida na árvore
+    elapsed: float = 0.0    # tempo de relógio, em segundos
+    stop_reason: str = ""   # "iterations", "time", "nodes", "decided", "stopped", "solved" ou "book"
+    stats: Optional[SearchStats] = None  # perfil da busca (só com profile=True)
+
+    # Junta as estatísticas de outra busca (workers do modo "root")
+    def merge(self, other: "SearchResult"):
+        self.playouts += other.playouts
+        self.nodes += other.nodes
+        self.depth = max(self.depth, other.depth)
+        if self.stats is not None and other.stats is not None:
+            self.stats.merge(other.stats)
+
+
+class _Budget:
+    # Controla os limites de uma busca: iterações, tempo de relógio, nós alocados
+    # e a paragem antecipada quando a jogada mais visitada já não pode ser ultrapassada
+    CHECK_EVERY = 64
+
+    def __init__(
+        self,
+        iterations: Optional[int],
+        time_limit: Optional[float],
+        max_nodes: Optional[int],
+        early_stop: bool,
+        stop: Optional[threading.Event] = None
+    ):
+        if iterations is None and time_limit is None and max_nodes is None and stop is None:
+            raise ValueError("A busca precisa de um limite de iterações, tempo ou nós.")
+        self.iterations = iterations
+        self.stop = stop
+        self.max_nodes = max_nodes
+        self.early_stop = early_stop
+        self.start = time.perf_counter()
+        self.deadline = None if time_limit is None else self.start + time_limit
+        self.playouts = 0
+        self.nodes = 0
+        self.depth = 0
+        self.stop_reason = ""
+        self._next_check = self.CHECK_EVERY
+
+    # Devolve True (e regista o motivo) se a busca deve parar antes da próxima iteração
+    def exhausted(self, root) -> bool:
+        if self.stop is not None and self.stop.is_set():
+            self.stop_reason = "stopped"
+            return True
+        if self.iterations is not None and self.playouts >= self.iterations:
+            self.stop_reason = "iterations"
+            return True
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            self.stop_reason = "nodes"
+            return True
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stop_reason = "time"
+            return True
+        if self.early_stop and self.playouts >= self._next_check:
+            self._next_check = self.playouts + self.CHECK_EVERY
+            if self._decided(root):
+                self.stop_reason = "decided"
+                return True
+        return False
+
+    # A escolha está decidida se a diferença entre as duas jogadas mais visitadas
+    # for maior do que os rollouts que ainda cabem no orçamento
+    def _decided(self, root) -> bool:
+        visits = list(root_visits(root).values())
+        if len(visits) < 2:
+            return True
+        remaining = math.inf
+        if self.iterations is not None:
+            remaining = self.iterations - self.playouts
+        if self.deadline is not None:
+            now = time.perf_counter()
+            rate = self.playouts / max(now - self.start, 1e-9)
+            remaining = min(remaining, rate * (self.deadline - now))
+        if remaining == math.inf:
+            return False
+        first, second = sorted(visits, reverse=True)[:2]
+        return first - second > remaining
+
+    def result(self, move: Optional[int] = None) -> SearchResult:
+        return SearchResult(
+            move=move,
+            playouts=self.playouts,
+            nodes=self.nodes,
+            depth=self.depth,
+            elapsed=time.perf_counter() - self.start,
+            stop_reason=self.stop_reason,
+        )
+
+
 class MCTS:
     def __init__(
         self,
-        iterations: int = 1000,
+        iterations: Optional[int] = 1000,
         exploration_weight: float = math.sqrt(2),
-        max_children: Optional[int] = None
+        max_children: Optional[int] = None,
+        transpositions: bool = False,
+        tt_max_entries: Optional[int] = None,
+        tt_max_bytes: Optional[int] = None,
+        workers: int = 1,
+        parallel: str = "root",
+        virtual_loss: int = 1,
+        time_limit: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+        early_stop: bool = True,
+        rollout_batch: int = 1,
+        tree: str = "nodes",
+        capacity: int = 200_000,
+        solver_threshold: Optional[int] = None,
+        solver_time: Optional[float] = 1.0,
+        book=None,
+        profile: bool = False,
+        profile_callback: Optional[Callable[[SearchStats], None]] = None,
+        profile_interval: float = 1.0
     ):
         """
-        :param iterations: número de simulações MCTS por jogada
+        :param iterations: número de simulações MCTS por jogada (None = sem limite)
         :param exploration_weight: coeficiente de exploração (c)
         :param max_children: limita quantos filhos são expandidos por nó (None = sem limite)
+        :param transpositions: partilha vitórias/visitas entre nós da mesma posição
+        :param tt_max_entries: limite de entradas da tabela de transposições (None = sem limite)
+        :param tt_max_bytes: limite aproximado de memória da tabela, em bytes (None = sem limite).
+                             Os dois limites só restringem quantas posições partilham
+                             estatísticas: os nós continuam a guardar as entradas
+                             descartadas e a árvore não é limitada (para isso, max_nodes)
+        :param workers: número de processos/threads da busca (1 = busca sequencial)
+        :param parallel: "root" (árvores independentes em processos, visitas da raiz somadas)
+                         ou "tree" (uma árvore partilhada por threads, com perda virtual)
+        :param virtual_loss: visitas fictícias somadas ao caminho em curso no modo "tree"
+        :param time_limit: tempo máximo de relógio por jogada, em segundos (None = sem limite)
+        :param max_nodes: número máximo de nós alocados por jogada (None = sem limite)
+        :param early_stop: para quando a jogada mais visitada já não pode ser ultrapassada
+        :param rollout_batch: rollouts por folha; acima de 1 usa o motor NumPy de ai.rollout
+        :param tree: "nodes" (objetos Node) ou "array" (arrays compactos de ai.tree_store)
+        :param capacity: número máximo de nós da árvore em modo "array"
+        :param solver_threshold: com este número de casas vazias ou menos, a jogada é
+                                 pedida ao solver exato de ai.solver (None = nunca)
+        :param solver_time: tempo máximo do solver por jogada; se não chegar a uma
+                            solução exata, a jogada é escolhida pelo MCTS
+        :param book: livro de aberturas (ai.book.OpeningBook) consultado antes de procurar
+        :param profile: mede o tempo de cada fase e conta nós, rollouts e sondagens de
+                        vitória; o perfil fica em last_result.stats (SearchStats).
+                        Desligado, a busca corre o ciclo normal, sem nenhum custo extra
+        :param profile_callback: chamado com o perfil parcial a cada profile_interval
+                                 segundos de busca e no fim (ex.: print_stats); liga o perfil
+        :param profile_interval: intervalo entre chamadas a profile_callback, em segundos
         """
+        if parallel not in ("root", "tree"):
+            raise ValueError(f"Modo paralelo desconhecido: {parallel!r}")
+        if workers < 1 or virtual_loss < 1 or rollout_batch < 1:
+            raise ValueError("workers, virtual_loss e rollout_batch têm de ser pelo menos 1.")
+        if rollout_batch > 1 and workers > 1 and parallel == "tree":
+            raise ValueError("Rollouts em lote não são suportados no modo paralelo \"tree\".")
+        if tree not in ("nodes", "array"):
+            raise ValueError(f"Tipo de árvore desconhecido: {tree!r}")
+        if tree == "array" and (transpositions or (workers > 1 and parallel == "tree")):
+            raise ValueError("A árvore em arrays não suporta transposições nem o modo paralelo \"tree\".")
         self.iterations = iterations
         self.exploration_weight = exploration_weight
         self.max_children = max_children
+        self.transpositions = transpositions
+        self.tt_max_entries = tt_max_entries
+        self.tt_max_bytes = tt_max_bytes
+        self.workers = workers
+        self.parallel = parallel
+        self.virtual_loss = virtual_loss
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.early_stop = early_stop
+        self.rollout_batch = rollout_batch
+        self.tree = tree
+        self.capacity = capacity
+        self.solver_threshold = solver_threshold
+        self.solver_time = solver_time
+        self.book = book
+        self.profile = profile
+        self.profile_callback = profile_callback
+        self.profile_interval = profile_interval
+        # Resultado da última busca
+        self.last_result: Optional[SearchResult] = None
+        # Tabela da última chamada a best_move (None fora do modo de transposições)
+        self.table: Optional[TranspositionTable] = None
+        # Processos do modo "root", criados na primeira busca paralela
+        self._pool: Optional["ProcessPoolExecutor"] = None
+        # Solver do fim de jogo, criado na primeira vez que é preciso
+        self._solver: Optional["Solver"] = None
+
+    # O pool, a tabela, o solver e o callback do perfil não vão para os processos filhos
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["table"] = None
+        state["_solver"] = None
+        if state["profile_callback"] is not None:
+            state["profile_callback"] = None
+            state["profile"] = True
+        return state
+
+    # Termina os processos do modo "root"
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "MCTS":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Cria o nó para a posição atual de `state`
+    @staticmethod
+    def _new_node(
+        state: Board,
+        table: Optional[TranspositionTable],
+        parent: Optional[Node] = None,
+        move: Optional[int] = None
+    ) -> Node:
+        if table is None:
+            return Node(state, parent=parent, move=move)
+        return TranspositionNode(state, table.entry(state.hash), parent=parent, move=move)
+
+    # Cria a raiz de uma busca: um Node ou, em modo "array", um TreeStore vazio
+    def new_root(self, board: Board, table: Optional[TranspositionTable] = None):
+        if self.tree == "array":
+            return TreeStore(self.capacity)
+        return self._new_node(board, table)
+
+    # Cria uma tabela de transposições nova (None fora do modo de transposições)
+    def new_table(self) -> Optional[TranspositionTable]:
+        if not self.transpositions:
+            return None
+        return TranspositionTable(self.tt_max_entries, self.tt_max_bytes)
 
     # Implementação do Algoritmo de Monte Carlo
-    def best_move(self, root_board: Board) -> int:
-        root = Node(root_board.copy())
-        player = root_board.current_player
+    # `time_limit` e `max_nodes` substituem, só nesta chamada, os valores do construtor
+    def best_move(
+        self,
+        root_board: Board,
+        time_limit: Optional[float] = None,
+        max_nodes: Optional[int] = None
+    ) -> int:
+        return self.think(root_board, time_limit, max_nodes).move
+
+    # Como best_move, mas devolve também as estatísticas da busca
+    def think(
+        self,
+        root_board: Board,
+        time_limit: Optional[float] = None,
+        max_nodes: Optional[int] = None
+    ) -> SearchResult:
+        self.table = self.new_table()
+        root = self.new_root(root_board, self.table)
+        return self.search_and_choose(root, root_board, self.table, time_limit, max_nodes)
 
-        for _ in range(self.iterations):
+    # Busca a partir de `root` e devolve a jogada escolhida com as estatísticas.
+    # No modo "root" este processo procura na sua árvore enquanto os outros
+    # workers - 1 procuram em árvores independentes; as visitas de cada jogada
+    # na raiz são somadas e ganha a mais visitada.
+    # Antes de procurar consulta o livro de aberturas e, perto do fim, o solver.
+    # `iterations` substitui o orçamento só na árvore de `root` (a que pode já ter
+    # visitas do pondering); as árvores novas dos workers fazem sempre self.iterations.
+    def search_and_choose(
+        self,
+        root: Node,
+        root_board: Board,
+        table: Optional[TranspositionTable] = None,
+        time_limit: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+        iterations: Optional[int] = None
+    ) -> SearchResult:
+        if self.book is not None:
+            move = self.book.lookup(root_board)
+            if move is not None and move in root_board.valid_moves():
+                self.last_result = SearchResult(move, stop_reason="book")
+                return self.last_result
+
+        solved = self._solve(root_board)
+        if solved is not None:
+            self.last_result = solved
+            return solved
+
+        if self.workers == 1 or self.parallel != "root":
+            result = self.search(root, root_board, table, time_limit, max_nodes, iterations=iterations)
+            visits = root_visits(root)
+            result.move = max(visits, key=visits.get)
+            self.last_result = result
+            return result
+
+        start = time.perf_counter()
+        futures = self._submit_root_workers(root_board, time_limit, max_nodes)
+        result = self.search(root, root_board, table, time_limit, max_nodes, iterations=iterations)
+        visits = root_visits(root)
+        for future in futures:
+            worker_visits, worker_result = future.result()
+            result.merge(worker_result)
+            for move, count in worker_visits.items():
+                visits[move] = visits.get(move, 0) + count
+        result.move = max(visits, key=visits.get)
+        result.elapsed = time.perf_counter() - start
+        self.last_result = result
+        return result
+
+    # Perto do fim do jogo entrega a posição ao solver exato. Devolve None se a
+    # posição tiver casas vazias a mais ou se o solver não a resolver a tempo.
+    def _solve(self, board: Board) -> Optional[SearchResult]:
+        if self.solver_threshold is None or board.is_game_over():
+            return None
+        if ROWS * COLS - board.plies > self.solver_threshold:
+            return None
+        if self._solver is None:
+            from ai.solver import Solver
+            self._solver = Solver()
+        solved = self._solver.solve(board, self.solver_time)
+        if not solved.exact:
+            return None
+        return SearchResult(
+            solved.move, nodes=solved.nodes, depth=solved.depth, elapsed=solved.elapsed, stop_reason="solved"
+        )
+
+    # Lança as árvores independentes do modo "root", cada uma com a sua semente
+    def _submit_root_workers(
+        self,
+        root_board: Board,
+        time_limit: Optional[float],
+        max_nodes: Optional[int]
+    ) -> list["Future"]:
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.workers - 1)
+        worker_engine = copy.copy(self)
+        worker_engine.workers = 1
+        worker_engine._pool = None
+        return [
+            self._pool.submit(
+                _root_worker, worker_engine, root_board, random.getrandbits(64), time_limit, max_nodes
+            )
+            for _ in range(self.workers - 1)
+        ]
+
+    # Cria o controlo de orçamento de uma busca (`iterations` substitui o do construtor).
+    # Com `stop` (pondering) o limite de iterações não se aplica: a busca corre
+    # até o evento ser ativado ou até esgotar o tempo ou os nós.
+    def _budget(
+        self,
+        time_limit: Optional[float],
+        max_nodes: Optional[int],
+        stop: Optional[threading.Event] = None,
+        iterations: Optional[int] = None
+    ) -> _Budget:
+        if stop is not None:
+            iterations = None
+        elif iterations is None:
+            iterations = self.iterations
+        return _Budget(
+            iterations,
+            self.time_limit if time_limit is None else time_limit,
+            self.max_nodes if max_nodes is None else max_nodes,
+            self.early_stop,
+            stop,
+        )
+
+    # Escolhe o filho mais visitado
+    @staticmethod
+    def most_visited(root: Node) -> Node:
+        return max(root.children, key=lambda c: c.visits)
+
+    # Corre as iterações a partir de `root`, que representa a posição de `root_board`.
+    # As jogadas de cada iteração são feitas sobre uma única cópia do tabuleiro
+    # e desfeitas no fim, em vez de copiar o tabuleiro a cada passo.
+    # As vitórias de cada nó contam do ponto de vista de quem fez a jogada que
+    # leva a ele, para que a mesma árvore sirva aos dois jogadores.
+    # Para ao esgotar as iterações, o tempo ou os nós, quando a escolha já está decidida
+    # ou quando o evento `stop` é ativado.
+    def search(
+        self,
+        root: Node,
+        root_board: Board,
+        table: Optional[TranspositionTable] = None,
+        time_limit: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+        stop: Optional[threading.Event] = None,
+        iterations: Optional[int] = None
+    ) -> SearchResult:
+        budget = self._budget(time_limit, max_nodes, stop, iterations)
+        if self.profile or self.profile_callback is not None:
+            return self._search_profiled(root, root_board, table, budget)
+        if isinstance(root, TreeStore):
+            self._search_store(root, root_board, budget)
+            return budget.result()
+        if self.workers > 1 and self.parallel == "tree":
+            self._search_shared_tree(root, root_board, table, budget)
+            return budget.result()
+
+        state = root_board.copy()
+        root_plies = state.plies
+        batch = self._batch_engine()
+
+        while not budget.exhausted(root):
             node = root
-            state = root_board.copy()
 
             # 1) Seleção
             while True:
@@ -67,38 +585,482 @@ class MCTS:
                 m = random.choice(node.untried_moves)
                 state.apply_move(m)
                 node.untried_moves.remove(m)
-                child = Node(state.copy(), parent=node, move=m)
+                child = self._new_node(state, table, parent=node, move=m)
                 node.children.append(child)
                 node = child
+                budget.nodes += 1
+
+            depth = state.plies - root_plies
+            if depth > budget.depth:
+                budget.depth = depth
 
             # 3) Simulação com heurística de vitória imediata
-            winner = self._rollout(state.copy())
+            n, score = self._simulate(state, batch)
+            budget.playouts += n
+
+            # 4) Retropropagação (a pontuação do adversário é n - score)
+            while node:
+                node.visits += n
+                node.wins += score
+                score = n - score
+                node = node.parent
+
+            # Volta o tabuleiro à posição da raiz
+            while state.plies > root_plies:
+                state.undo_move()
+
+        return budget.result()
+
+    # Mesma busca que search(), com o tempo de cada fase medido e os contadores do
+    # SearchStats. É um ciclo à parte para que a busca normal não pague nada pelo perfil.
+    # Na árvore em arrays e no modo "tree" só os totais da busca ficam no perfil.
+    def _search_profiled(
+        self,
+        root,
+        root_board: Board,
+        table: Optional[TranspositionTable],
+        budget: _Budget
+    ) -> SearchResult:
+        stats = SearchStats()
+        callback = self.profile_callback
+        if isinstance(root, TreeStore) or (self.workers > 1 and self.parallel == "tree"):
+            start = time.perf_counter()
+            if isinstance(root, TreeStore):
+                self._search_store(root, root_board, budget)
+            else:
+                self._search_shared_tree(root, root_board, table, budget)
+            stats.iterations = budget.playouts // self.rollout_batch
+            stats.rollouts = budget.playouts
+            stats.nodes_created = budget.nodes
+            stats.max_depth = budget.depth
+            stats.simulation_time = time.perf_counter() - start
+        else:
+            self._profiled_loop(root, root_board, table, budget, stats, callback)
+        result = budget.result()
+        result.stats = stats
+        if callback is not None:
+            callback(stats)
+        return result
+
+    def _profiled_loop(
+        self,
+        root: Node,
+        root_board: Board,
+        table: Optional[TranspositionTable],
+        budget: _Budget,
+        stats: SearchStats,
+        callback: Optional[Callable[[SearchStats], None]]
+    ):
+        perf = time.perf_counter
+        state = root_board.copy()
+        root_plies = state.plies
+        batch = self._batch_engine()
+        next_report = perf() + self.profile_interval if callback is not None else math.inf
+
+        while not budget.exhausted(root):
+            node = root
+            t0 = perf()
+
+            # 1) Seleção
+            while True:
+                can_expand = (
+                    node.untried_moves and
+                    (self.max_children is None or len(node.children) < self.max_children)
+                )
+                if can_expand or not node.children:
+                    break
+                stats.selection_steps += 1
+                stats.children_seen += len(node.children)
+                node = node.uct_select_child(self.exploration_weight)
+                state.apply_move(node.move)
+            t1 = perf()
+
+            # 2) Expansão
+            if node.untried_moves and (
+                self.max_children is None or len(node.children) < self.max_children
+            ):
+                m = random.choice(node.untried_moves)
+                state.apply_move(m)
+                node.untried_moves.remove(m)
+                child = self._new_node(state, table, parent=node, move=m)
+                node.children.append(child)
+                node = child
+                budget.nodes += 1
+                stats.nodes_created += 1
+
+            depth = state.plies - root_plies
+            if depth > budget.depth:
+                budget.depth = depth
+            stats.depth_sum += depth
+            if depth > stats.max_depth:
+                stats.max_depth = depth
+            t2 = perf()
+
+            # 3) Simulação
+            if batch is None:
+                mover = PLAYER_X if state.current_player == PLAYER_O else PLAYER_O
+                winner = self._rollout_profiled(state, stats)
+                n, score = 1, 1.0 if winner == mover else 0.5 if winner is None else 0.0
+            else:
+                mover = PLAYER_X if state.current_player == PLAYER_O else PLAYER_O
+                n = self.rollout_batch
+                score = batch.score(state, n, mover, stats)
+                stats.rollouts += n
+                stats.measured_rollouts += n
+            budget.playouts += n
+            t3 = perf()
 
             # 4) Retropropagação
             while node:
-                node.visits += 1
-                if winner == player:
-                    node.wins += 1
-                elif winner is None:
-                    node.wins += 0.5
+                node.visits += n
+                node.wins += score
+                score = n - score
                 node = node.parent
 
-        # escolhe o filho mais visitado
-        best_child = max(root.children, key=lambda c: c.visits)
-        return best_child.move
+            while state.plies > root_plies:
+                state.undo_move()
+            t4 = perf()
+
+            stats.iterations += 1
+            stats.selection_time += t1 - t0
+            stats.expansion_time += t2 - t1
+            stats.simulation_time += t3 - t2
+            stats.backprop_time += t4 - t3
+            if t4 >= next_report:
+                callback(stats)
+                next_report = t4 + self.profile_interval
+
+    # Motor de rollouts em lote (None se rollout_batch == 1)
+    def _batch_engine(self):
+        if self.rollout_batch == 1:
+            return None
+        # Importado só aqui para que o NumPy não seja carregado sem necessidade
+        from ai.rollout import BatchRollout
+        return BatchRollout(random.getrandbits(64))
+
+    # Faz os rollouts a partir de `state` e devolve (n, score): `score` é a pontuação,
+    # em `n` rollouts, de quem fez a última jogada (1 por vitória, 0.5 por empate)
+    def _simulate(self, state: Board, batch) -> tuple[int, float]:
+        mover = PLAYER_X if state.current_player == PLAYER_O else PLAYER_O
+        if batch is None:
+            winner = self._rollout(state)
+            return 1, 1.0 if winner == mover else 0.5 if winner is None else 0.0
+        n = self.rollout_batch
+        return n, batch.score(state, n, mover)
+
+    # Mesma busca que search(), sobre a árvore em arrays de um TreeStore.
+    # Quando não há espaço para expandir, a árvore é reciclada no início da iteração
+    # (os índices mudam, por isso nunca a meio de um caminho).
+    def _search_store(self, store: TreeStore, root_board: Board, budget: _Budget):
+        state = root_board.copy()
+        root_plies = state.plies
+        batch = self._batch_engine()
+        c = self.exploration_weight
+        sqrt, log = math.sqrt, math.log
+
+        while not budget.exhausted(store):
+            if not store.has_room():
+                store.recycle()
+            parent, move, visits, wins = store.parent, store.move, store.visits, store.wins
+            first_child, n_children = store.first_child, store.n_children
+            node = 0
+
+            # 1) Seleção (um filho com 0 visitas é um movimento ainda não tentado)
+            while True:
+                first = first_child[node]
+                if first < 0:
+                    break
+                block = range(first, first + n_children[node])
+                untried = [i for i in block if visits[i] == 0]
+                if untried:
+                    node = random.choice(untried)
+                    state.apply_move(move[node])
+                    break
+                log_parent = log(visits[node])
+                node = max(block, key=lambda i: wins[i] / visits[i] + c * sqrt(log_parent / visits[i]))
+                state.apply_move(move[node])
+
+            # 2) Expansão: cria o bloco de filhos de uma folha já visitada
+            if first_child[node] < 0 and (visits[node] > 0 or node == 0) and not state.is_game_over():
+                moves = state.valid_moves()
+                if self.max_children is not None and len(moves) > self.max_children:
+                    moves = random.sample(moves, self.max_children)
+                first = store.expand(node, moves)
+                budget.nodes += len(moves)
+                node = first + random.randrange(len(moves))
+                state.apply_move(move[node])
+
+            depth = state.plies - root_plies
+            if depth > budget.depth:
+                budget.depth = depth
+
+            # 3) Simulação
+            n, score = self._simulate(state, batch)
+            budget.playouts += n
+
+            # 4) Retropropagação
+            while node >= 0:
+                visits[node] += n
+                wins[node] += score
+                score = n - score
+                node = parent[node]
+
+            while state.plies > root_plies:
+                state.undo_move()
+
+    # Busca com uma árvore partilhada por `workers` threads.
+    # Seleção, expansão e retropropagação são feitas com um lock; só o rollout
+    # corre fora dele. Cada nó do caminho em curso recebe `virtual_loss` visitas
+    # sem vitórias, para que as outras threads prefiram explorar outros ramos,
+    # e essas visitas são retiradas na retropropagação.
+    # Nota: com o GIL do CPython os rollouts não correm em simultâneo; o ganho
+    # só aparece num interpretador sem GIL (free-threaded).
+    def _search_shared_tree(
+        self,
+        root: Node,
+        root_board: Board,
+        table: Optional[TranspositionTable],
+        budget: _Budget
+    ):
+        lock = threading.Lock()
+        vl = self.virtual_loss
+
+        def worker(seed: int):
+            rng = random.Random(seed)
+            state = root_board.copy()
+            root_plies = state.plies
+            while True:
+                with lock:
+                    # Os rollouts em curso das outras threads contam como já feitos
+                    if budget.exhausted(root):
+                        return
+                    budget.playouts += 1
+
+                    node = root
+                    node.visits += vl
+                    while True:
+                        can_expand = (
+                            node.untried_moves and
+                            (self.max_children is None or len(node.children) < self.max_children)
+                        )
+                        if can_expand or not node.children:
+                            break
+                        node = node.uct_select_child(self.exploration_weight)
+                        node.visits += vl
+                        state.apply_move(node.move)
+
+                    if node.untried_moves and (
+                        self.max_children is None or len(node.children) < self.max_children
+                    ):
+                        m = rng.choice(node.untried_moves)
+                        state.apply_move(m)
+                        node.untried_moves.remove(m)
+                        child = self._new_node(state, table, parent=node, move=m)
+                        node.children.append(child)
+                        node = child
+                        node.visits += vl
+                        budget.nodes += 1
+
+                    depth = state.plies - root_plies
+                    if depth > budget.depth:
+                        budget.depth = depth
+
+                mover = PLAYER_X if state.current_player == PLAYER_O else PLAYER_O
+                winner = self._rollout(state, rng)
+
+                with lock:
+                    while node:
+                        node.visits += 1 - vl
+                        if winner == mover:
+                            node.wins += 1
+                        elif winner is None:
+                            node.wins += 0.5
+                        mover = PLAYER_X if mover == PLAYER_O else PLAYER_O
+                        node = node.parent
+
+                while state.plies > root_plies:
+                    state.undo_move()
+
+        threads = [
+            threading.Thread(target=worker, args=(random.getrandbits(64),))
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
 
     # Rollout com heuristica simples para tentar encontrar vitoria
-    def _rollout(self, board: Board) -> Optional[int]:
+    # Joga diretamente sobre o tabuleiro recebido; quem chama desfaz as jogadas
+    def _rollout(self, board: Board, rng=random) -> Optional[int]:
         while not board.is_game_over():
             moves = board.valid_moves()
             player = board.current_player
-            # Heurística: checar movimento de vitória usando copia
+            # Heurística: checar movimento de vitória sem copiar o tabuleiro
             for m in moves:
-                temp = board.copy()
-                temp.apply_move(m)
-                if temp.get_winner() == player:
+                if board.is_winning_move(m):
                     return player
             # se não há vitória imediata, escolhe aleatório
+            board.apply_move(rng.choice(moves))
+        return board.get_winner()
+
+    # _rollout com os contadores do perfil (mesmas escolhas aleatórias)
+    def _rollout_profiled(self, board: Board, stats: SearchStats) -> Optional[int]:
+        stats.rollouts += 1
+        stats.measured_rollouts += 1
+        start = board.plies
+        while not board.is_game_over():
+            moves = board.valid_moves()
+            player = board.current_player
+            for m in moves:
+                stats.win_probes += 1
+                if board.is_winning_move(m):
+                    stats.win_probe_hits += 1
+                    stats.rollout_moves += board.plies - start
+                    return player
             board.apply_move(random.choice(moves))
+        stats.rollout_moves += board.plies - start
         return board.get_winner()
 
+
+# Worker do modo "root": procura numa árvore própria e devolve as visitas
+# de cada jogada na raiz e as estatísticas da busca
+def _root_worker(
+    engine: MCTS,
+    root_board: Board,
+    seed: int,
+    time_limit: Optional[float],
+    max_nodes: Optional[int]
+) -> tuple[dict[int, int], SearchResult]:
+    random.seed(seed)
+    table = engine.new_table()
+    root = engine.new_root(root_board, table)
+    result = engine.search(root, root_board, table, time_limit, max_nodes)
+    return root_visits(root), result
+
+
+
+class SearchSession:
+    # Sessão de busca persistente: guarda a árvore entre jogadas e, a cada chamada,
+    # avança a raiz pelas jogadas realmente feitas (as do próprio motor e as do
+    # adversário), reaproveitando a subárvore correspondente. Os ramos que deixam
+    # de ser alcançáveis ficam sem referências e são libertados pelo Python.
+    DEFAULT_PONDER_NODES = 200_000
+
+    def __init__(self, engine: MCTS):
+        self.engine = engine
+        self.root = None  # Node, ou TreeStore em modo "array"
+        # Jogadas que levam da posição inicial à posição da raiz
+        self.history: list[int] = []
+        # A tabela de transposições também é mantida durante a sessão
+        self.table: Optional[TranspositionTable] = engine.new_table()
+        # Estado do pondering (busca em segundo plano durante a vez do adversário)
+        self._ponder_thread: Optional[threading.Thread] = None
+        self._ponder_stop: Optional[threading.Event] = None
+        self._ponder_result: Optional[SearchResult] = None
+
+    # Avança a raiz para o filho da jogada indicada (descarta a árvore se não existir)
+    def advance(self, move: int):
+        self.history.append(move)
+        if self.root is None:
+            return
+        if isinstance(self.root, TreeStore):
+            # Sem o filho, o TreeStore fica só com uma raiz nova e continua a ser usado
+            self.root.advance(move)
+            return
+        for child in self.root.children:
+            if child.move == move:
+                child.parent = None
+                self.root = child
+                return
+        self.root = None
+
+    # Alinha a raiz com o histórico de jogadas do tabuleiro
+    def sync(self, board: Board):
+        moves = board.moves
+        n = len(self.history)
+        if len(moves) < n or moves[:n] != self.history:
+            self.reset()
+            n = 0
+        for move in moves[n:]:
+            self.advance(move)
+
+    # Começa a procurar em segundo plano a partir da posição atual, enquanto o
+    # adversário pensa. Quando ele jogar, best_move avança a raiz para a sua
+    # jogada e continua a partir da subárvore já explorada.
+    # :param max_nodes: limite de nós alocados durante o pondering
+    #                   (None = o max_nodes do motor ou, sem ele, DEFAULT_PONDER_NODES)
+    def start_pondering(self, board: Board, max_nodes: Optional[int] = None):
+        self.stop_pondering()
+        if board.is_game_over():
+            return
+        self.sync(board)
+        if self.root is None:
+            self.root = self.engine.new_root(board, self.table)
+        if max_nodes is None:
+            max_nodes = self.engine.max_nodes or self.DEFAULT_PONDER_NODES
+
+        stop = threading.Event()
+        position = board.copy()
+        root, table = self.root, self.table
+
+        def ponder():
+            self._ponder_result = self.engine.search(root, position, table, max_nodes=max_nodes, stop=stop)
+
+        self._ponder_stop = stop
+        self._ponder_thread = threading.Thread(target=ponder, daemon=True)
+        self._ponder_thread.start()
+
+    # Para o pondering (espera a iteração em curso) e devolve as estatísticas dele
+    def stop_pondering(self) -> Optional[SearchResult]:
+        if self._ponder_thread is None:
+            return None
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        self._ponder_thread = None
+        self._ponder_stop = None
+        result, self._ponder_result = self._ponder_result, None
+        return result
+
+    @property
+    def pondering(self) -> bool:
+        return self._ponder_thread is not None
+
+    # Descarta a árvore (por exemplo, ao começar um novo jogo)
+    def reset(self):
+        self.stop_pondering()
+        self.root = None
+        self.history = []
+        self.table = self.engine.new_table()
+
+    # Procura a melhor jogada continuando a árvore das jogadas anteriores
+    def best_move(
+        self,
+        board: Board,
+        time_limit: Optional[float] = None,
+        max_nodes: Optional[int] = None
+    ) -> int:
+        return self.think(board, time_limit, max_nodes).move
+
+    # Como best_move, mas devolve também as estatísticas da busca
+    def think(
+        self,
+        board: Board,
+        time_limit: Optional[float] = None,
+        max_nodes: Optional[int] = None
+    ) -> SearchResult:
+        pondered = self.stop_pondering() is not None
+        self.sync(board)
+        if self.root is None:
+            self.root = self.engine.new_root(board, self.table)
+        # Depois de pondering, os rollouts já feitos a partir da nova raiz contam
+        # para o orçamento de iterações da árvore da sessão: mesma força, resposta
+        # quase imediata. No modo "root" os outros workers partem de árvores novas
+        # e fazem sempre o orçamento inteiro.
+        iterations = None
+        if pondered and self.engine.iterations is not None:
+            done = self.root.visits[0] if isinstance(self.root, TreeStore) else self.root.visits
+            iterations = max(self.engine.iterations - done, 0)
+        return self.engine.search_and_choose(
+            self.root, board, self.table, time_limit, max_nodes, iterations=iterations
+        )
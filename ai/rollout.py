@@ -0,0 +1,84 @@
+from typing import Optional
+
+import numpy as np
+
+from game.board import Board, COLS, H1, PLAYER_O, PLAYER_X, ROWS
+
+# Índice "cheio" (primeira sentinela) de cada coluna, como em game.board
+_COLUMN_FULL = np.array([c * H1 + ROWS for c in range(COLS)], dtype=np.int64)
+_SHIFTS = tuple(np.uint64(s) for s in (1, H1, H1 - 1, H1 + 1))
+_ONE = np.uint64(1)
+
+
+# Versão vetorizada de game.board.has_four: True onde o bitboard tem quatro em linha
+def has_four(bitboards: np.ndarray) -> np.ndarray:
+    found = np.zeros(bitboards.shape, dtype=bool)
+    for shift in _SHIFTS:
+        pairs = bitboards & (bitboards >> shift)
+        found |= (pairs & (pairs >> (shift + shift))) != 0
+    return found
+
+
+class BatchRollout:
+    # Joga N rollouts aleatórios ao mesmo tempo a partir da mesma posição.
+    # Cada jogo é um par de bitboards uint64 mais as alturas das colunas; a cada
+    # lance as jogadas legais, as vitórias imediatas (nas 7 colunas de uma vez)
+    # e as quedas são calculadas com operações NumPy sobre o lote inteiro.
+    # Segue a mesma política de MCTS._rollout: se houver vitória imediata o
+    # jogador da vez ganha, senão joga numa coluna legal ao acaso.
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+
+    # Devolve o vencedor de cada rollout (0 = empate). Com `stats` (um
+    # ai.mcts.SearchStats), soma as jogadas feitas e as colunas testadas por
+    # vitória imediata, como o rollout instrumentado do MCTS.
+    def play(self, board: Board, n: int, stats=None) -> np.ndarray:
+        winners = np.zeros(n, dtype=np.int8)
+        if board.is_game_over():
+            winners[:] = board.winner or 0
+            return winners
+
+        player = board.current_player
+        # Como todos os jogos avançam ao mesmo tempo, o jogador da vez é o mesmo em todo o lote
+        mine = np.full(n, board.bitboards[player - 1], dtype=np.uint64)
+        theirs = np.full(n, board.bitboards[2 - player], dtype=np.uint64)
+        heights = np.tile(np.array(board.heights, dtype=np.int64), (n, 1))
+        games = np.arange(n)
+
+        while games.size:
+            legal = heights < _COLUMN_FULL
+            drops = np.left_shift(_ONE, heights.astype(np.uint64))
+            wins = has_four(mine[:, None] | drops) & legal
+            won = wins.any(axis=1)
+            winners[games[won]] = player
+            if stats is not None:
+                stats.win_probes += int(np.count_nonzero(legal))
+                stats.win_probe_hits += int(np.count_nonzero(won))
+
+            # Continuam os jogos sem vitória e com colunas livres (os outros acabaram empatados)
+            keep = ~won & legal.any(axis=1)
+            games = games[keep]
+            legal = legal[keep]
+            drops = drops[keep]
+            heights = heights[keep]
+            mine = mine[keep]
+            theirs = theirs[keep]
+
+            scores = self.rng.random(legal.shape)
+            scores[~legal] = -1.0
+            columns = scores.argmax(axis=1)
+            rows = np.arange(games.size)
+            if stats is not None:
+                stats.rollout_moves += games.size
+            mine |= drops[rows, columns]
+            heights[rows, columns] += 1
+
+            mine, theirs = theirs, mine
+            player = PLAYER_X if player == PLAYER_O else PLAYER_O
+
+        return winners
+
+    # Pontuação de `player` em n rollouts: 1 por vitória e 0.5 por empate
+    def score(self, board: Board, n: int, player: int, stats=None) -> float:
+        winners = self.play(board, n, stats)
+        return float(np.count_nonzero(winners == player) + 0.5 * np.count_nonzero(winners == 0))
@@ -0,0 +1,229 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from game.board import BOARD_MASK, BOTTOM_MASK, COLS, H1, ROWS, Board
+
+CELLS: int = ROWS * COLS
+
+# Ordem de exploração das colunas: do centro para as bordas
+CENTER_ORDER: tuple[int, ...] = tuple(sorted(range(COLS), key=lambda c: abs(c - COLS // 2)))
+
+# Máscara de cada coluna (todas as casas jogáveis)
+_COLUMN_MASK: tuple[int, ...] = tuple(((1 << ROWS) - 1) << (c * H1) for c in range(COLS))
+
+# Tipos de entrada da tabela de transposições
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+# Casas vazias onde `position` completaria quatro em linha (técnica de Pascal Pons)
+def winning_cells(position: int, mask: int) -> int:
+    # vertical
+    r = (position << 1) & (position << 2) & (position << 3)
+    # horizontal e as duas diagonais
+    for s in (H1, H1 - 1, H1 + 1):
+        p = (position << s) & (position << (2 * s))
+        r |= p & (position << (3 * s))
+        r |= p & (position >> s)
+        p = (position >> s) & (position >> (2 * s))
+        r |= p & (position << s)
+        r |= p & (position >> (3 * s))
+    return r & (BOARD_MASK ^ mask)
+
+
+# Coluna de um bit do bitboard
+def _column(bit: int) -> int:
+    return (bit.bit_length() - 1) // H1
+
+
+class _Timeout(Exception):
+    pass
+
+
+@dataclass
+class SolveResult:
+    # Resultado do solver para a posição pedida
+    move: Optional[int]
+    score: int = 0          # > 0: o jogador da vez ganha; < 0: perde; 0: empate (ou desconhecido)
+    exact: bool = False     # True se a busca foi até ao fim do jogo em todas as linhas
+    depth: int = 0          # profundidade da última iteração completa
+    nodes: int = 0
+    elapsed: float = 0.0
+
+
+class Solver:
+    # Solver exato de Connect 4: negamax com cortes alfa-beta sobre bitboards,
+    # aprofundamento iterativo (a profundidade sobe até cobrir todas as casas
+    # vazias), ordenação das jogadas (ameaças criadas e depois centro primeiro),
+    # tabela de transposições de tamanho fixo e limite de tempo.
+    # O score segue a convenção de Pons: ganhar com a k-ésima peça própria
+    # ainda por jogar vale (43 - lances) // 2; perder vale o simétrico.
+    def __init__(self, tt_size: int = 1 << 20, time_limit: Optional[float] = None):
+        """
+        :param tt_size: número de entradas da tabela de transposições
+        :param time_limit: tempo máximo por chamada a solve, em segundos (None = sem limite)
+        """
+        self.tt_size = tt_size
+        self.time_limit = time_limit
+        self.table: list = [None] * tt_size
+        self.nodes = 0
+        self._deadline: Optional[float] = None
+
+    # Limpa a tabela de transposições
+    def reset(self):
+        self.table = [None] * self.tt_size
+
+    # Procura a melhor jogada da posição. Com limite de tempo devolve a jogada da
+    # última profundidade completa; `exact` indica se o resultado é garantido.
+    def solve(self, board: Board, time_limit: Optional[float] = None) -> SolveResult:
+        start = time.perf_counter()
+        time_limit = self.time_limit if time_limit is None else time_limit
+        self._deadline = None if time_limit is None else start + time_limit
+        self.nodes = 0
+
+        current = board.bitboards[board.current_player - 1]
+        mask = board.bitboards[0] | board.bitboards[1]
+        plies = board.plies
+        empty = CELLS - plies
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+
+        if board.is_game_over():
+            return SolveResult(None, exact=True)
+
+        # Vitória imediata
+        wins = winning_cells(current, mask) & possible
+        if wins:
+            move = next(col for col in CENTER_ORDER if wins & _COLUMN_MASK[col])
+            return SolveResult(move, (CELLS + 1 - plies) // 2, True, 1, 1, time.perf_counter() - start)
+
+        result = SolveResult(self._fallback_move(current, mask, possible))
+        for depth in range(1, empty + 1):
+            try:
+                score, move = self._root(current, mask, plies, depth)
+            except _Timeout:
+                break
+            # Um resultado decisivo dentro do horizonte não muda com mais profundidade:
+            # o horizonte vale 0, por isso um score não nulo é uma vitória/derrota provada
+            result = SolveResult(move, score, depth >= empty or score != 0, depth, self.nodes)
+            if result.exact:
+                break
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    # Jogada usada se nem a profundidade 1 terminar: a mais central que não perde já
+    def _fallback_move(self, current: int, mask: int, possible: int) -> int:
+        safe = self._non_losing(current, mask, possible) or possible
+        for col in CENTER_ORDER:
+            if safe & _COLUMN_MASK[col]:
+                return col
+        return _column(possible & -possible)
+
+    # Jogadas que não dão vitória imediata ao adversário (0 se todas perdem)
+    @staticmethod
+    def _non_losing(current: int, mask: int, possible: int) -> int:
+        opponent_wins = winning_cells(current ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                return 0
+            possible = forced
+        return possible & ~(opponent_wins >> 1)
+
+    # Ordena as jogadas: primeiro a da tabela, depois as que criam mais ameaças
+    # e, em empate, as mais centrais
+    def _ordered_moves(self, current: int, mask: int, moves: int, tt_move: Optional[int]) -> list[int]:
+        scored = []
+        for rank, col in enumerate(CENTER_ORDER):
+            bit = moves & _COLUMN_MASK[col]
+            if bit:
+                threats = bin(winning_cells(current | bit, mask | bit)).count("1")
+                first = col == tt_move
+                scored.append((not first, -threats, rank, bit))
+        scored.sort()
+        return [item[3] for item in scored]
+
+    # Raiz da busca: devolve (score, coluna)
+    def _root(self, current: int, mask: int, plies: int, depth: int) -> tuple[int, int]:
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        moves = self._non_losing(current, mask, possible)
+        if not moves:
+            # Todas as jogadas perdem: escolhe a mais central
+            return -((CELLS - plies) // 2), self._fallback_move(current, mask, possible)
+
+        alpha, beta = -CELLS, CELLS
+        best_move = None
+        entry = self.table[(current + mask) % self.tt_size]
+        tt_move = entry[4] if entry is not None and entry[0] == current + mask else None
+        for bit in self._ordered_moves(current, mask, moves, tt_move):
+            score = -self._negamax(current ^ mask, mask | bit, plies + 1, -beta, -alpha, depth - 1)
+            if best_move is None or score > alpha:
+                alpha = score
+                best_move = _column(bit)
+        self._store(current + mask, depth, EXACT, alpha, best_move)
+        return alpha, best_move
+
+    def _store(self, key: int, depth: int, flag: int, value: int, move: Optional[int]):
+        self.table[key % self.tt_size] = (key, depth, flag, value, move)
+
+    # Negamax com alfa-beta; devolve o score do ponto de vista do jogador da vez.
+    # No horizonte (depth == 0) devolve 0, por isso só buscas até ao fim são exatas.
+    def _negamax(self, current: int, mask: int, plies: int, alpha: int, beta: int, depth: int) -> int:
+        self.nodes += 1
+        if self._deadline is not None and self.nodes & 1023 == 0 and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        if winning_cells(current, mask) & possible:
+            return (CELLS + 1 - plies) // 2
+
+        moves = self._non_losing(current, mask, possible)
+        if not moves:
+            return -((CELLS - plies) // 2)
+        if plies >= CELLS - 2:
+            return 0
+        if depth <= 0:
+            return 0
+
+        # Sem vitória imediata, o melhor possível é ganhar dois lances depois
+        upper = (CELLS - 1 - plies) // 2
+        if beta > upper:
+            beta = upper
+            if alpha >= beta:
+                return beta
+
+        key = current + mask
+        slot = key % self.tt_size
+        entry = self.table[slot]
+        tt_move = None
+        # Buscas que chegam ao fim do jogo valem para qualquer profundidade
+        full_depth = depth >= CELLS - plies
+        if entry is not None and entry[0] == key:
+            tt_move = entry[4]
+            if entry[1] >= depth or entry[1] >= CELLS - plies:
+                flag, value = entry[2], entry[3]
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value > alpha:
+                    alpha = value
+                elif flag == UPPER and value < beta:
+                    beta = value
+                if alpha >= beta:
+                    return value
+
+        alpha_orig = alpha
+        best = -CELLS
+        best_move = None
+        for bit in self._ordered_moves(current, mask, moves, tt_move):
+            score = -self._negamax(current ^ mask, mask | bit, plies + 1, -beta, -alpha, depth - 1)
+            if score > best:
+                best = score
+                best_move = _column(bit)
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        flag = UPPER if best <= alpha_orig else LOWER if best >= beta else EXACT
+        self.table[slot] = (key, CELLS if full_depth else depth, flag, best, best_move)
+        return best
@@ -0,0 +1,74 @@
+import sys
+from collections import OrderedDict
+from typing import Optional
+
+# Custo aproximado, em bytes, de uma entrada da tabela: a lista [vitórias, visitas],
+# os dois números, a chave de 64 bits e o slot/ligação do OrderedDict.
+ENTRY_BYTES: int = (
+    sys.getsizeof([0.0, 0])
+    + sys.getsizeof(0.0)
+    + sys.getsizeof(1 << 40)
+    + sys.getsizeof(1 << 63)
+    + 100
+)
+
+
+class TranspositionTable:
+    # Tabela de transposições do MCTS: associa o hash Zobrist de uma posição
+    # a uma entrada [vitórias, visitas] partilhada por todos os nós que a representam.
+    # É limitada por número de entradas e/ou bytes; ao encher, descarta a entrada
+    # usada há mais tempo (LRU). O limite é o da tabela, não o da memória da busca:
+    # os nós que já têm uma entrada descartada mantêm-na viva e a árvore de nós
+    # cresce à parte (limitada pelo max_nodes do MCTS).
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        :param max_entries: número máximo de entradas (None = sem limite)
+        :param max_bytes: memória máxima aproximada das entradas na tabela, em bytes
+                          (None = sem limite); não conta as entradas descartadas
+                          ainda usadas pelos nós nem os próprios nós
+        """
+        limits = []
+        if max_entries is not None:
+            limits.append(max_entries)
+        if max_bytes is not None:
+            limits.append(max_bytes // ENTRY_BYTES)
+        self.capacity: Optional[int] = min(limits) if limits else None
+        if self.capacity is not None and self.capacity < 1:
+            raise ValueError("A tabela de transposições precisa de pelo menos uma entrada.")
+        self._entries: "OrderedDict[int, list]" = OrderedDict()
+        self.hits: int = 0
+        self.evictions: int = 0
+
+    # Devolve a entrada da posição, criando-a (e descartando a mais antiga) se não existir.
+    # Nós que já guardam uma entrada descartada continuam a usá-la, só deixam de a partilhar.
+    def entry(self, key: int) -> list:
+        entries = self._entries
+        found = entries.get(key)
+        if found is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return found
+
+        found = [0.0, 0]
+        entries[key] = found
+        if self.capacity is not None and len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return found
+
+    # Devolve a entrada se existir, sem criar nem alterar a ordem LRU
+    def get(self, key: int) -> Optional[list]:
+        return self._entries.get(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+
+    # Memória aproximada ocupada pelas entradas
+    def approx_bytes(self) -> int:
+        return len(self._entries) * ENTRY_BYTES
+
+    def clear(self):
+        self._entries.clear()
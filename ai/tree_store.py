@@ -0,0 +1,122 @@
+import heapq
+from array import array
+
+from game.board import COLS
+
+# Bytes por nó nos arrays paralelos (pai, jogada, visitas, vitórias, primeiro filho, nº de filhos)
+NODE_BYTES: int = 4 + 1 + 8 + 8 + 4 + 1
+
+
+class TreeStore:
+    # Árvore do MCTS guardada em arrays paralelos pré-alocados, em vez de objetos Node.
+    # O nó 0 é sempre a raiz. Os filhos de um nó ocupam um bloco contíguo que
+    # começa em first_child e tem n_children posições; são todos criados quando o
+    # nó é expandido e os que ainda têm 0 visitas são os "movimentos não tentados".
+    # Os nós não guardam tabuleiros: a busca reconstrói a posição jogando as
+    # jogadas do caminho a partir da raiz.
+    # A capacidade é um limite rígido; quando não há espaço para mais um bloco,
+    # recycle() reconstrói a árvore mantendo só os blocos mais visitados e
+    # devolve as restantes posições para uso.
+    def __init__(self, capacity: int):
+        if capacity < 2 * (COLS + 1):
+            raise ValueError(f"A capacidade tem de ser pelo menos {2 * (COLS + 1)} nós.")
+        self.capacity = capacity
+        self.parent = array("i", [-1]) * capacity
+        self.move = array("b", [-1]) * capacity
+        self.visits = array("q", [0]) * capacity
+        self.wins = array("d", [0.0]) * capacity
+        self.first_child = array("i", [-1]) * capacity
+        self.n_children = array("b", [0]) * capacity
+        self.size = 1
+        self.recycles = 0
+
+    # Há espaço para expandir mais um nó (um bloco de até COLS filhos)?
+    def has_room(self) -> bool:
+        return self.size + COLS <= self.capacity
+
+    # Cria o bloco de filhos de `node` para as jogadas indicadas e devolve o índice do primeiro
+    def expand(self, node: int, moves: list[int]) -> int:
+        first = self.size
+        for i, m in enumerate(moves):
+            # As posições podem ter sido usadas antes de uma reciclagem: limpa tudo
+            self.parent[first + i] = node
+            self.move[first + i] = m
+            self.visits[first + i] = 0
+            self.wins[first + i] = 0.0
+            self.first_child[first + i] = -1
+            self.n_children[first + i] = 0
+        self.first_child[node] = first
+        self.n_children[node] = len(moves)
+        self.size = first + len(moves)
+        return first
+
+    # Visitas de cada jogada a partir da raiz
+    def root_visits(self) -> dict[int, int]:
+        first = self.first_child[0]
+        if first < 0:
+            return {}
+        return {self.move[i]: self.visits[i] for i in range(first, first + self.n_children[0])}
+
+    # Liberta espaço mantendo, a partir da raiz, os blocos de filhos dos nós mais
+    # visitados até ocupar metade da capacidade. Os nós cujo bloco é descartado
+    # passam a folhas (mantendo as suas estatísticas) e podem voltar a ser expandidos.
+    def recycle(self):
+        self._rebuild(0, self.capacity // 2)
+        self.recycles += 1
+
+    # Move a raiz para o filho da jogada indicada, mantendo a subárvore dele.
+    # Devolve False se a raiz não tiver esse filho (a árvore fica só com a raiz).
+    def advance(self, move: int) -> bool:
+        first = self.first_child[0]
+        if first >= 0:
+            for i in range(first, first + self.n_children[0]):
+                if self.move[i] == move:
+                    self._rebuild(i, self.capacity)
+                    return True
+        self.clear()
+        return False
+
+    # Esvazia a árvore, deixando só uma raiz nova
+    def clear(self):
+        self.size = 1
+        self.parent[0] = -1
+        self.move[0] = -1
+        self.visits[0] = 0
+        self.wins[0] = 0.0
+        self.first_child[0] = -1
+        self.n_children[0] = 0
+
+    # Reconstrói a árvore a partir de `root` com no máximo `limit` nós, escolhendo
+    # os blocos de filhos por ordem decrescente de visitas do pai
+    def _rebuild(self, root: int, limit: int):
+        first_child, n_children, visits = self.first_child, self.n_children, self.visits
+        order = [root]              # índices antigos, pela nova ordem
+        new_first: dict[int, int] = {}   # índice antigo do pai -> novo índice do primeiro filho
+        heap = [(-visits[root], root)]
+        while heap:
+            _, node = heapq.heappop(heap)
+            first, n = first_child[node], n_children[node]
+            if first < 0 or len(order) + n > limit:
+                continue
+            new_first[node] = len(order)
+            for child in range(first, first + n):
+                order.append(child)
+                if first_child[child] >= 0:
+                    heapq.heappush(heap, (-visits[child], child))
+
+        new_index = {old: new for new, old in enumerate(order)}
+        size = len(order)
+        parent = array("i", (new_index.get(self.parent[old], -1) for old in order))
+        parent[0] = -1
+        self.parent[:size] = parent
+        self.move[:size] = array("b", (self.move[old] for old in order))
+        self.visits[:size] = array("q", (visits[old] for old in order))
+        self.wins[:size] = array("d", (self.wins[old] for old in order))
+        self.first_child[:size] = array("i", (new_first.get(old, -1) for old in order))
+        self.n_children[:size] = array("b", (n_children[old] if old in new_first else 0 for old in order))
+        self.move[0] = -1
+        self.size = size
+
+    # Memória ocupada pelos arrays
+    def nbytes(self) -> int:
+        return self.capacity * NODE_BYTES
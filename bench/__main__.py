@@ -0,0 +1,80 @@
+import argparse
+import fnmatch
+import os
+import sys
+
+# Garante que conseguimos importar os módulos do projeto (python -m bench na raiz ou noutra pasta)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench import cases  # noqa: F401  (regista os casos)
+from bench.harness import CASES, compare, format_time, load_results, run_cases, save_results
+
+
+def print_comparison(rows: list[dict], threshold: float) -> int:
+    print(f"{'caso':<26} {'base':>12} {'atual':>12} {'rácio':>8}")
+    regressions = 0
+    for row in rows:
+        flag = {"regression": "  REGRESSÃO", "improvement": "  melhoria"}.get(row["status"], "")
+        print(f"{row['name']:<26} {format_time(row['baseline']):>12} {format_time(row['current']):>12} "
+              f"{row['ratio']:>7.2f}x{flag}")
+        regressions += row["status"] == "regression"
+    if regressions:
+        print(f"{regressions} caso(s) mais de {threshold:.0%} mais lentos que a base.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmarks do tabuleiro, da busca e do ID3")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="corre os benchmarks (comando por omissão)")
+    run.add_argument("-k", "--filter", action="append", default=[],
+                     help="só os casos com este padrão (ex.: 'board.*'); pode repetir-se")
+    run.add_argument("--out", help="grava os resultados neste ficheiro JSON")
+    run.add_argument("--repeat", type=int, default=5, help="amostras por caso")
+    run.add_argument("--min-time", type=float, default=0.2, help="duração mínima de cada amostra (s)")
+    run.add_argument("--quick", action="store_true", help="cargas mais pequenas, para verificações rápidas")
+    run.add_argument("--baseline", help="compara no fim com estes resultados (JSON)")
+    run.add_argument("--threshold", type=float, default=0.10, help="abrandamento tolerado (0.10 = 10%%)")
+
+    cmp = commands.add_parser("compare", help="compara dois ficheiros de resultados")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="abrandamento tolerado (0.10 = 10%%)")
+
+    commands.add_parser("list", help="lista os casos")
+
+    args = parser.parse_args(sys.argv[1:] or ["run"])
+    if args.command is None:
+        args = parser.parse_args(["run"] + sys.argv[1:])
+
+    if args.command == "list":
+        for name, bench in CASES.items():
+            print(f"{name:<26} por {bench.unit}")
+        return 0
+
+    if args.command == "compare":
+        rows = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+        return 1 if print_comparison(rows, args.threshold) else 0
+
+    names = [name for name in CASES if not args.filter or any(fnmatch.fnmatch(name, p) for p in args.filter)]
+    if not names:
+        parser.error("Nenhum caso corresponde ao filtro.")
+
+    def report(name, result):
+        print(f"{name:<26} {format_time(result['median']):>12} por {result['unit']:<9} "
+              f"({result['per_second']:,.0f}/s, ±{result['stdev'] / result['median']:.1%})")
+
+    results = run_cases(names, repeat=args.repeat, min_time=args.min_time, quick=args.quick, report=report)
+    if args.out:
+        save_results(results, args.out)
+        print(f"Resultados gravados em {args.out}")
+    if args.baseline:
+        print()
+        rows = compare(load_results(args.baseline), results, args.threshold)
+        return 1 if print_comparison(rows, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import os
+import random
+
+from bench.harness import case
+from game.board import Board
+
+# Semente de todas as cargas: os mesmos jogos, posições e dados em todas as execuções
+SEED = 12345
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+# Jogos aleatórios completos (listas de jogadas) gerados com a semente fixa
+def random_games(n: int, seed: int = SEED) -> list[list[int]]:
+    rng = random.Random(seed)
+    games = []
+    for _ in range(n):
+        board = Board()
+        while not board.is_game_over():
+            board.apply_move(rng.choice(board.valid_moves()))
+        games.append(list(board.moves))
+    return games
+
+
+# Posições a meio de jogos aleatórios, com `plies` jogadas e sem vencedor
+def random_positions(n: int, plies: int, seed: int = SEED) -> list[Board]:
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < n:
+        board = Board()
+        while board.plies < plies and not board.is_game_over():
+            board.apply_move(rng.choice(board.valid_moves()))
+        if board.plies == plies and not board.is_game_over():
+            positions.append(board)
+    return positions
+
+
+@case("board.apply_undo", unit="jogada")
+def board_apply_undo(quick):
+    games = random_games(20 if quick else 100)
+    board = Board()
+
+    def run():
+        for moves in games:
+            for move in moves:
+                board.apply_move(move)
+            for _ in moves:
+                board.undo_move()
+    return run, sum(len(moves) for moves in games)
+
+
+@case("board.check_win", unit="posição")
+def board_check_win(quick):
+    positions = random_positions(200 if quick else 1000, 20)
+
+    def run():
+        for board in positions:
+            board.check_win()
+    return run, len(positions)
+
+
+@case("board.is_winning_move", unit="posição")
+def board_is_winning_move(quick):
+    positions = random_positions(200 if quick else 1000, 20)
+    tests = [(board, board.valid_moves()[0]) for board in positions]
+
+    def run():
+        for board, move in tests:
+            board.is_winning_move(move)
+    return run, len(tests)
+
+
+@case("board.copy", unit="posição")
+def board_copy(quick):
+    positions = random_positions(200 if quick else 1000, 20)
+
+    def run():
+        for board in positions:
+            board.copy()
+    return run, len(positions)
+
+
+@case("board.to_feature_vector", unit="posição")
+def board_to_feature_vector(quick):
+    positions = random_positions(200 if quick else 1000, 20)
+
+    def run():
+        for board in positions:
+            board.to_feature_vector()
+    return run, len(positions)
+
+
+def _mcts_case(quick, **options):
+    from ai.mcts import MCTS
+    engine = MCTS(iterations=300 if quick else 2000, early_stop=False, **options)
+    positions = [Board()] + random_positions(1, 8)
+    playouts = [0]
+
+    def run():
+        # A semente é reposta para que cada execução faça exatamente a mesma busca
+        random.seed(SEED)
+        playouts[0] = 0
+        for board in positions:
+            engine.best_move(board)
+            playouts[0] += engine.last_result.playouts
+    return run, lambda: playouts[0]
+
+
+@case("mcts.playouts", unit="playout")
+def mcts_playouts(quick):
+    return _mcts_case(quick)
+
+
+@case("mcts.playouts_array", unit="playout")
+def mcts_playouts_array(quick):
+    return _mcts_case(quick, tree="array")
+
+
+@case("mcts.playouts_profiled", unit="playout")
+def mcts_playouts_profiled(quick):
+    # Custo do perfil por fases (profile=True) em relação a mcts.playouts
+    return _mcts_case(quick, profile=True)
+
+
+@case("solver.solve", unit="posição")
+def solver_solve(quick):
+    from ai.solver import Solver
+    positions = random_positions(2, 26) if quick else random_positions(5, 22)
+
+    def run():
+        # Tabela nova em cada execução: mede a resolução completa, não a tabela já cheia
+        solver = Solver()
+        for board in positions:
+            solver.solve(board)
+    return run, len(positions)
+
+
+# Dataset do ID3 (o CSV do repositório, pelo cache int8 de dataset.py)
+def _id3_data(quick):
+    import numpy as np
+    from dataset import load_dataset
+    data = load_dataset(os.path.join(ROOT, "data", "connect4_dataset.csv"))
+    rows = 2000 if quick else len(data)
+    return np.ascontiguousarray(data.X[:rows]), np.asarray(data.y[:rows]), data.feature_names
+
+
+@case("id3.fit", unit="treino")
+def id3_fit(quick):
+    from id3 import ID3Tree
+    X, y, names = _id3_data(quick)
+
+    def run():
+        ID3Tree(max_depth=20).fit(X, y, feature_names=names)
+    return run, 1
+
+
+def _compiled_tree(quick):
+    from id3 import ID3Tree
+    X, y, names = _id3_data(quick)
+    tree = ID3Tree(max_depth=20)
+    tree.fit(X, y, feature_names=names)
+    return tree.compile(), X
+
+
+@case("id3.predict_batch", unit="amostra")
+def id3_predict_batch(quick):
+    compiled, X = _compiled_tree(quick)
+
+    def run():
+        compiled.predict(X)
+    return run, len(X)
+
+
+@case("id3.predict_one", unit="amostra")
+def id3_predict_one(quick):
+    compiled, X = _compiled_tree(quick)
+    rows = X[:1000].tolist()
+
+    def run():
+        for row in rows:
+            compiled.predict_one(row)
+    return run, len(rows)
+
+
+# Arranque de um interpretador novo (na raiz do repositório) que corre `code`.
+# Sem PYTHONDONTWRITEBYTECODE: a execução de aquecimento grava o bytecode e as
+# amostras medem o arranque normal, não a compilação dos módulos.
+def _startup_case(code):
+    import subprocess
+    import sys
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    command = [sys.executable, "-c", code]
+
+    def run():
+        subprocess.run(command, cwd=ROOT, env=env, check=True)
+    return run, 1
+
+
+@case("startup.python", unit="arranque")
+def startup_python(quick):
+    # Referência: o interpretador sem importar nada do projeto
+    return _startup_case("pass")
+
+
+@case("startup.import_main", unit="arranque")
+def startup_import_main(quick):
+    # O que o jogo entre humanos paga antes de jogar
+    return _startup_case("import main")
+
+
+@case("startup.mcts_engine", unit="arranque")
+def startup_mcts_engine(quick):
+    return _startup_case(
+        "import main\n"
+        "from ai.book import load_book\n"
+        "from ai.mcts import MCTS, SearchSession\n"
+        "SearchSession(MCTS(iterations=500, book=load_book()))"
+    )
+
+
+@case("startup.id3_engine", unit="arranque")
+def startup_id3_engine(quick):
+    return _startup_case("import main\nmain.load_id3_model()")
@@ -0,0 +1,152 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+# Casos registados por @case, pela ordem de registo
+CASES: dict[str, "Case"] = {}
+
+
+class Case:
+    # Um benchmark: `setup(quick)` prepara os dados (fora da medição) e devolve
+    # (run, ops): `run()` é a carga medida e `ops` o nº de operações que ela faz,
+    # ou uma função que devolve esse nº depois de cada execução (ex.: playouts).
+    def __init__(self, name: str, unit: str, setup: Callable):
+        self.name = name
+        self.unit = unit
+        self.setup = setup
+
+
+def case(name: str, unit: str = "op"):
+    def register(setup):
+        CASES[name] = Case(name, unit, setup)
+        return setup
+    return register
+
+
+def measure(run: Callable, ops, repeat: int = 5, min_time: float = 0.2) -> list[float]:
+    """
+    Tempo por operação, em segundos, de `repeat` amostras. Cada amostra repete
+    `run` até passarem pelo menos `min_time` segundos; antes há uma execução de
+    aquecimento que não conta.
+    """
+    run()
+    samples = []
+    for _ in range(repeat):
+        done = 0
+        start = time.perf_counter()
+        while True:
+            run()
+            done += ops() if callable(ops) else ops
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        samples.append(elapsed / done)
+    return samples
+
+
+def run_cases(
+    names: list[str],
+    repeat: int = 5,
+    min_time: float = 0.2,
+    quick: bool = False,
+    report: Optional[Callable[[str, dict], None]] = None
+) -> dict:
+    """
+    Corre os casos indicados e devolve os resultados no formato gravado em JSON.
+    """
+    results = {}
+    for name in names:
+        bench = CASES[name]
+        run, ops = bench.setup(quick)
+        samples = measure(run, ops, repeat, min_time)
+        median = statistics.median(samples)
+        results[name] = {
+            "unit": bench.unit,
+            "median": median,
+            "min": min(samples),
+            "mean": statistics.fmean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "per_second": 1 / median if median else None,
+            "samples": samples,
+        }
+        if report is not None:
+            report(name, results[name])
+    return {"meta": environment(quick, repeat, min_time), "results": results}
+
+
+# Máquina, versões e commit em que os resultados foram obtidos
+def environment(quick: bool, repeat: int, min_time: float) -> dict:
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "numpy": numpy_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": quick,
+        "repeat": repeat,
+        "min_time": min_time,
+    }
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[dict]:
+    """
+    Compara as medianas dos casos presentes nos dois resultados.
+    Args:
+        threshold (float): Aumento relativo do tempo por operação a partir do
+            qual um caso é marcado como regressão (0.10 = 10% mais lento).
+    Returns:
+        list: Uma entrada por caso, com o rácio atual/base e o estado
+            ("regression", "improvement" ou "ok").
+    """
+    rows = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = now["median"] / before["median"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline": before["median"], "current": now["median"],
+                     "ratio": ratio, "status": status})
+    return rows
+
+
+# Tempo com a unidade mais legível
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
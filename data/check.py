@@ -1,27 +1,45 @@
-import pandas as pd
 import os
+import sys
+
+import numpy as np
 import matplotlib.pyplot as plt
 
-# Caminho absoluto para o arquivo CSV
-csv_path = os.path.abspath(os.path.join('../data/connect4_dataset.csv'))
+# Garante que conseguimos importar os módulos do projeto
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dataset import load_dataset
+from shards import SHARD_EXT, Shard
+
+# Caminho absoluto para o dataset: o shard binário (.c4s) se existir, senão o CSV
+data_dir = os.path.dirname(os.path.abspath(__file__))
+csv_path = os.path.join(data_dir, 'connect4_dataset.c4s')
+if not os.path.exists(csv_path):
+    csv_path = os.path.join(data_dir, 'connect4_dataset.csv')
 
-# Carregar o arquivo CSV
-data = pd.read_csv(csv_path)
+# Carregar o dataset (sem pandas: cache int8 do CSV ou o shard, por mmap)
+data = load_dataset(csv_path)
 print("Primeiras linhas do dataset:")
-print(data.head())
+print(",".join(data.columns))
+for row in data.data[:, :5].T:
+    print(",".join(str(value) for value in row))
 print("\nInformações sobre o dataset:")
-print(data.info())
+print(f"{csv_path}: {len(data)} linhas, {len(data.columns)} colunas (int8)")
+
+# Os shards guardam também o resultado do jogo para o jogador da vez
+if csv_path.endswith(SHARD_EXT):
+    outcomes = Shard.open(csv_path).outcome
+    for name, value in (("vitórias", 1), ("empates", 0), ("derrotas", -1)):
+        print(f"Posições com {name}: {int(np.count_nonzero(outcomes == value))}")
+
 
-    
 # Contagem dos movimentos realizados em cada coluna
-move_counts = data['move'].value_counts().sort_index()
+move_counts = np.bincount(data.y, minlength=7)
 
 # Plotar a distribuição dos movimentos
 plt.figure(figsize=(8, 5))
-plt.bar(move_counts.index, move_counts.values, color='skyblue')
+plt.bar(range(len(move_counts)), move_counts, color='skyblue')
 plt.xlabel("Coluna")
 plt.ylabel("Frequência de Movimentos")
 plt.title("Distribuição dos Movimentos Feitos pela IA")
 plt.xticks(range(7))  # Colunas de 0 a 6
 plt.show()
-
@@ -1,42 +1,31 @@
-import matplotlib.pyplot as plt
-from game.game import Game
-from ai.mcts import MCTS
-from main import load_id3_model, id3_ai
-
-def simulate_games(n_games: int, mcts_iterations: int) -> list[int]:
-
-    # 1) Carrega uma única vez o modelo ID3
-    id3_model = load_id3_model()
-
-    winners: list[int] = []
-
-    for i in range(1, n_games + 1):
-        game = Game()
-        while game.is_active():
-            if game.board.current_player == 1:
-                # MCTS faz a jogada quando for o 0
-                # move = MCTS(iterations=mcts_iterations).best_move(game.board)
-                move = id3_ai(game, id3_model)
-            else:
-                # ID3 faz a jogada quando for o X
-                #move = id3_ai(game, id3_model)
-                move = MCTS(iterations=mcts_iterations).best_move(game.board)
-            game.make_move(move)
-
-        # Ao terminar, guarda quem ganhou (1 ou 2)
-        winners.append(game.board.get_winner())
-
-    print(f"✓ Simulação concluída: {n_games} jogos.")
-    return winners
-
-
-def plot_pie(winners: list[int]) -> None:
-
-    # Contagem simples
-    count_mcts = winners.count(1)
-    count_id3  = winners.count(2)
-    labels = ["ID3 (X)","MCTS (0)"]
-    sizes  = [count_mcts, count_id3]
+from ai.arena import ArenaResult, ID3Player, MCTSPlayer, run_match
+from ai.book import DEFAULT_PATH
+
+def simulate_games(n_games: int, mcts_iterations: int, workers: int = None) -> ArenaResult:
+
+    # ID3 contra MCTS no torneio de ai.arena: os jogos correm em paralelo, as cores
+    # alternam (cada motor joga metade dos jogos com X) e o torneio para antes dos
+    # n_games quando o SPRT já decidiu. O MCTS reaproveita a árvore entre jogadas e
+    # consulta o livro de aberturas (se existir).
+    result = run_match(
+        ID3Player(),
+        MCTSPlayer(iterations=mcts_iterations, book_path=DEFAULT_PATH),
+        games=n_games,
+        workers=workers,
+    )
+
+    print(f"✓ Simulação concluída: {result.games} jogos.")
+    print(result.summary())
+    return result
+
+
+def plot_pie(result: ArenaResult) -> None:
+    # O matplotlib só é importado para desenhar (importar o módulo para simular não o carrega)
+    import matplotlib.pyplot as plt
+
+    # Resultados do ponto de vista do ID3 (o primeiro motor do torneio)
+    labels = ["ID3", "Empates", "MCTS"]
+    sizes  = [result.wins, result.draws, result.losses]
 
     fig, ax = plt.subplots(figsize=(6,6))
     ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
@@ -0,0 +1,193 @@
+import json
+import os
+import struct
+from itertools import islice
+
+import numpy as np
+
+# Cache binário do dataset: cabeçalho fixo, metadados em JSON e os dados em int8,
+# guardados por coluna (uma linha do array por coluna do CSV) e lidos por mmap
+CACHE_MAGIC = b"C4DS"
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct("<4sII")   # magic, versão, tamanho do JSON
+# Os dados começam alinhados a este número de bytes
+_DATA_ALIGN = 64
+# Linhas do CSV lidas e convertidas de cada vez
+CHUNK_ROWS = 100_000
+
+
+class Dataset:
+    # Dataset (estado do tabuleiro -> jogada) lido por mmap a partir do cache.
+    # `data` tem uma linha por coluna do CSV; X e y são vistas sem cópia:
+    # X tem forma (amostras × atributos) e cada atributo é contíguo em memória,
+    # que é o que o treino do ID3 precisa para o usar diretamente.
+    # `weights` é o peso de cada amostra (None = todas com peso 1), como nos
+    # datasets com as linhas repetidas fundidas de dedup.py.
+    def __init__(self, data, columns, path=None, weights=None):
+        self.data = data
+        self.columns = columns
+        self.feature_names = columns[:-1]
+        self.target = columns[-1]
+        self.path = path
+        self.weights = weights
+        self.X = data[:-1].T
+        self.y = data[-1]
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    # Índices de treino e teste. Sem `seed` o treino são as primeiras `train_frac`
+    # amostras (slices, sem cópia); com `seed` as amostras são baralhadas antes.
+    def split(self, train_frac=0.8, seed=None):
+        n = len(self)
+        train_size = int(n * train_frac)
+        if seed is None:
+            return slice(0, train_size), slice(train_size, n)
+        order = np.random.default_rng(seed).permutation(n)
+        return np.sort(order[:train_size]), np.sort(order[train_size:])
+
+    @classmethod
+    def open(cls, path):
+        """
+        Abre um cache criado por build_cache.
+        """
+        with open(path, "rb") as f:
+            head = f.read(CACHE_HEADER.size)
+            if len(head) < CACHE_HEADER.size:
+                raise ValueError(f"{path} não é um cache de dataset.")
+            magic, version, meta_size = CACHE_HEADER.unpack(head)
+            if magic != CACHE_MAGIC:
+                raise ValueError(f"{path} não é um cache de dataset.")
+            if version != CACHE_VERSION:
+                raise ValueError(f"Versão do cache não suportada: {version}")
+            meta = json.loads(f.read(meta_size).decode("utf-8"))
+        offset = _data_offset(meta_size)
+        shape = (len(meta["columns"]), meta["rows"])
+        if os.path.getsize(path) != offset + shape[0] * shape[1]:
+            raise ValueError(f"{path} está truncado.")
+        data = np.memmap(path, dtype=np.int8, mode="r", offset=offset, shape=shape) if shape[1] else \
+            np.empty(shape, dtype=np.int8)
+        return cls(data, meta["columns"], path=path)
+
+
+def _data_offset(meta_size):
+    return (CACHE_HEADER.size + meta_size + _DATA_ALIGN - 1) // _DATA_ALIGN * _DATA_ALIGN
+
+
+# Identifica a versão do CSV de onde o cache foi criado
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+# Número de linhas de dados do CSV (sem o cabeçalho), lido em blocos
+def _count_rows(csv_path):
+    lines = 0
+    last = b"\n"
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 23), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+# Colunas do CSV (a primeira linha)
+def csv_columns(csv_path):
+    with open(csv_path, newline="") as f:
+        return f.readline().strip().split(",")
+
+
+# Lê as linhas de dados do CSV em blocos de `chunk_rows`, como arrays int8 (linhas × colunas)
+def iter_csv_chunks(csv_path, chunk_rows=CHUNK_ROWS):
+    with open(csv_path, newline="") as f:
+        n_cols = len(f.readline().strip().split(","))
+        rows = 0
+        while True:
+            lines = [line for line in islice(f, chunk_rows) if line.strip()]
+            if not lines:
+                break
+            values = np.fromstring(",".join(line.strip() for line in lines), dtype=np.int64, sep=",")
+            if values.size != len(lines) * n_cols:
+                raise ValueError(f"Linha com número de colunas errado perto da linha {rows + 2} de {csv_path}.")
+            if values.size and (values.min() < -128 or values.max() > 127):
+                raise ValueError(f"Valores fora do intervalo de int8 em {csv_path}.")
+            rows += len(lines)
+            yield values.astype(np.int8).reshape(len(lines), n_cols)
+
+
+def build_cache(csv_path, cache_path, chunk_rows=CHUNK_ROWS):
+    """
+    Converte o CSV no cache binário sem nunca o ter todo em memória: as linhas
+    são lidas em blocos de `chunk_rows`, convertidas para int8 e escritas
+    diretamente na sua posição do ficheiro (mapeado em memória).
+    """
+    columns = csv_columns(csv_path)
+    n_cols = len(columns)
+    capacity = _count_rows(csv_path)
+    meta = {"rows": capacity, "columns": columns, **_source_stamp(csv_path)}
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    offset = _data_offset(len(meta_bytes))
+
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.truncate(offset + n_cols * capacity)
+
+    rows = 0
+    if capacity:
+        data = np.memmap(tmp_path, dtype=np.int8, mode="r+", offset=offset, shape=(n_cols, capacity))
+        for chunk in iter_csv_chunks(csv_path, chunk_rows):
+            data[:, rows:rows + len(chunk)] = chunk.T
+            rows += len(chunk)
+
+        # Linhas em branco: compacta as colunas para o número real de amostras
+        if rows < capacity:
+            flat = np.memmap(tmp_path, dtype=np.int8, mode="r+", offset=offset, shape=(n_cols * capacity,))
+            for col in range(1, n_cols):
+                flat[col * rows:(col + 1) * rows] = flat[col * capacity:col * capacity + rows]
+            flat.flush()
+            del flat
+        data.flush()
+        del data
+
+    # O número real de linhas nunca tem mais dígitos que a estimativa: os
+    # metadados são completados com espaços para os dados não mudarem de posição
+    meta["rows"] = rows
+    final_meta = json.dumps(meta).encode("utf-8").ljust(len(meta_bytes))
+    with open(tmp_path, "r+b") as f:
+        f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(final_meta)))
+        f.write(final_meta)
+        f.truncate(offset + n_cols * rows)
+    os.replace(tmp_path, cache_path)
+
+
+def load_dataset(csv_path, cache_path=None, chunk_rows=CHUNK_ROWS):
+    """
+    Abre o dataset a partir do cache binário, criando-o (ou recriando-o, se o
+    CSV tiver mudado) quando for preciso. Um shard binário de posições
+    (shards.py, extensão .c4s) é lido diretamente, sem cache.
+    Args:
+        csv_path (str): CSV com as colunas cell_0..cell_41 e move, ou um shard .c4s.
+        cache_path (str): Ficheiro do cache; por omissão o CSV com a extensão .i8.
+    Returns:
+        Dataset: Dados mapeados em memória.
+    """
+    from shards import SHARD_EXT, load_shards
+    if csv_path.endswith(SHARD_EXT):
+        return load_shards(csv_path)
+    cache_path = cache_path or os.path.splitext(csv_path)[0] + ".i8"
+    if not os.path.exists(csv_path):
+        return Dataset.open(cache_path)
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                magic, version, meta_size = CACHE_HEADER.unpack(f.read(CACHE_HEADER.size))
+                meta = json.loads(f.read(meta_size).decode("utf-8"))
+            stamp = _source_stamp(csv_path)
+            if magic == CACHE_MAGIC and version == CACHE_VERSION and all(meta.get(k) == v for k, v in stamp.items()):
+                return Dataset.open(cache_path)
+        except (struct.error, ValueError):
+            pass
+    build_cache(csv_path, cache_path, chunk_rows)
+    return Dataset.open(cache_path)
@@ -0,0 +1,218 @@
+import os
+from array import array
+
+import numpy as np
+
+from dataset import CHUNK_ROWS, Dataset, csv_columns, iter_csv_chunks
+from shards import CELLS, FEATURE_NAMES, SHARD_EXT, Shard, decode_features, encode_features
+
+# Deduplicação das posições de self-play. Cada posição (nas máscaras de 42 bits
+# de shards.py) é levada à sua forma canónica: a menor entre ela e a sua imagem
+# no espelho esquerda-direita, com a jogada também espelhada. As linhas
+# (posição canónica, jogada) repetidas são fundidas numa só com o nº de
+# ocorrências como peso, que o ID3Tree.fit aceita em sample_weight.
+
+ROWS, COLS = 6, 7
+CENTER = COLS // 2
+
+# Bits de cada coluna nas máscaras (o bit r * COLS + c é a célula da linha r, a contar do topo)
+_COLUMN_MASKS = [sum(1 << (r * COLS + c) for r in range(ROWS)) for c in range(COLS)]
+
+
+def mirror_masks(masks):
+    """
+    Espelha máscaras de 42 bits na vertical (a coluna c passa a COLS - 1 - c).
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    mirrored = np.zeros_like(masks)
+    for col, column_mask in enumerate(_COLUMN_MASKS):
+        part = masks & np.uint64(column_mask)
+        shift = COLS - 1 - 2 * col
+        mirrored |= part << np.uint64(shift) if shift >= 0 else part >> np.uint64(-shift)
+    return mirrored
+
+
+def position_keys(x, o):
+    """
+    Chave de 49 bits de cada posição e da sua imagem no espelho. Cada coluna
+    ocupa 7 bits: as peças de X a partir de baixo e um bit 1 logo acima da
+    última peça, o que identifica a posição sem ambiguidade (as peças estão
+    sempre empilhadas a partir de baixo).
+    Returns:
+        tuple: Arrays uint64 (chave, chave do espelho).
+    """
+    x = np.asarray(x, dtype=np.uint64)
+    mask = x | np.asarray(o, dtype=np.uint64)
+    key = np.zeros_like(x)
+    mirrored = np.zeros_like(x)
+    one = np.uint64(1)
+    for col in range(COLS):
+        height = np.zeros_like(x)
+        stacked = np.zeros_like(x)
+        code = np.zeros_like(x)
+        for k in range(ROWS):
+            bit = np.uint64((ROWS - 1 - k) * COLS + col)
+            occupied = (mask >> bit) & one
+            height += occupied
+            stacked |= occupied << np.uint64(k)
+            code |= ((x >> bit) & one) << np.uint64(k)
+        if np.any(stacked != (one << height) - one):
+            raise ValueError("Posição impossível: há peças sem apoio por baixo.")
+        code |= one << height
+        key |= code << np.uint64(col * COLS)
+        mirrored |= code << np.uint64((COLS - 1 - col) * COLS)
+    return key, mirrored
+
+
+class PositionIndex:
+    # Índice (tabela de hash) das linhas distintas vistas até agora, alimentado
+    # por blocos. Guarda, pela ordem do primeiro aparecimento, as máscaras, a
+    # jogada e o nº de ocorrências de cada linha; a ordem conta, porque o ID3
+    # desempata as divisões pela ordem de aparecimento dos valores.
+    # Com `mirror=False` só as linhas exatamente iguais são fundidas.
+    def __init__(self, mirror=True):
+        self.mirror = mirror
+        self.rows_seen = 0
+        self._slots = {}
+        self._x = array("Q")
+        self._o = array("Q")
+        self._move = array("b")
+        self._weight = array("q")
+
+    def __len__(self):
+        return len(self._weight)
+
+    def add(self, x, o, move):
+        """
+        Acrescenta um bloco de posições (máscaras uint64) e as jogadas feitas.
+        """
+        x = np.asarray(x, dtype=np.uint64)
+        o = np.asarray(o, dtype=np.uint64)
+        move = np.asarray(move, dtype=np.int64)
+        key, mirrored_key = position_keys(x, o)
+        if self.mirror:
+            flip = mirrored_key < key
+            key = np.where(flip, mirrored_key, key)
+            move = np.where(flip, COLS - 1 - move, move)
+            x = np.where(flip, mirror_masks(x), x)
+            o = np.where(flip, mirror_masks(o), o)
+
+        # Primeiro funde as repetições dentro do bloco; só as linhas distintas
+        # passam pela tabela de hash
+        pairs = key << np.uint64(3) | move.astype(np.uint64)
+        unique, first, counts = np.unique(pairs, return_index=True, return_counts=True)
+        order = np.argsort(first)
+        slots = self._slots
+        for pair, i, count in zip(unique[order].tolist(), first[order].tolist(), counts[order].tolist()):
+            slot = slots.get(pair)
+            if slot is None:
+                slots[pair] = len(self._weight)
+                self._x.append(int(x[i]))
+                self._o.append(int(o[i]))
+                self._move.append(int(move[i]))
+                self._weight.append(count)
+            else:
+                self._weight[slot] += count
+        self.rows_seen += len(pairs)
+
+    def add_features(self, features, move):
+        """
+        Acrescenta posições no formato de Board.to_feature_vector (amostras × 42).
+        """
+        x, o = encode_features(features)
+        self.add(x, o, move)
+
+    # Linhas distintas pela ordem do primeiro aparecimento: (x, o, jogada, peso)
+    def entries(self):
+        return (
+            np.array(self._x, dtype=np.uint64),
+            np.array(self._o, dtype=np.uint64),
+            np.array(self._move, dtype=np.int8),
+            np.array(self._weight, dtype=np.int64),
+        )
+
+    def distributions(self):
+        """
+        Distribuição das jogadas de cada posição distinta.
+        Returns:
+            tuple: Máscaras (x, o) das posições, pela ordem do primeiro
+                aparecimento, e a matriz (posições × COLS) com o nº de vezes
+                que cada coluna foi jogada.
+        """
+        x, o, move, weight = self.entries()
+        key, _ = position_keys(x, o)
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        counts = np.zeros((len(first), COLS), dtype=np.int64)
+        np.add.at(counts, (rank[inverse.ravel()], move), weight)
+        return x[first[order]], o[first[order]], counts
+
+    def to_dataset(self, augment=True):
+        """
+        Dataset pesado com as linhas distintas, para o treino do ID3
+        (fit(data.X, data.y, sample_weight=data.weights)).
+        Args:
+            augment (bool): Com o índice canónico (mirror=True), junta a cada
+                linha a sua imagem no espelho com o mesmo peso. A árvore fica
+                então a valer para as duas orientações, sem ter de levar as
+                posições à forma canónica antes de prever.
+        Returns:
+            Dataset: Atributos cell_0..cell_41, alvo move e os pesos.
+        """
+        x, o, move, weight = self.entries()
+        if augment and self.mirror:
+            mx, mo = mirror_masks(x), mirror_masks(o)
+            # Uma posição simétrica com a jogada no centro é a sua própria imagem
+            same = (mx == x) & (mo == o) & (move == CENTER)
+            keep = ~same
+            x = np.column_stack((x, mx)).ravel()
+            o = np.column_stack((o, mo)).ravel()
+            move = np.column_stack((move, COLS - 1 - move)).ravel()
+            weight = np.column_stack((weight * (1 + same), weight)).ravel()
+            valid = np.column_stack((np.ones_like(keep), keep)).ravel()
+            x, o, move, weight = x[valid], o[valid], move[valid], weight[valid]
+        data = np.empty((CELLS + 1, len(x)), dtype=np.int8)
+        decode_features(x, o, out=data[:CELLS])
+        data[CELLS] = move
+        return Dataset(data, FEATURE_NAMES + ["move"], weights=weight)
+
+
+# Blocos (x, o, jogadas) de um shard .c4s ou de um CSV com cell_0..cell_41 e move
+def iter_positions(path, chunk_rows=CHUNK_ROWS):
+    if path.endswith(SHARD_EXT):
+        shard = Shard.open(path)
+        for start in range(0, len(shard), chunk_rows):
+            records = shard.records[start:start + chunk_rows]
+            yield records["x"], records["o"], records["move"]
+        return
+    columns = csv_columns(path)
+    cells = [columns.index(name) for name in FEATURE_NAMES]
+    move = columns.index("move")
+    for chunk in iter_csv_chunks(path, chunk_rows):
+        x, o = encode_features(chunk[:, cells])
+        yield x, o, chunk[:, move]
+
+
+def build_index(paths, mirror=True, chunk_rows=CHUNK_ROWS):
+    """
+    Percorre os shards (ou CSV) por blocos, sem os carregar inteiros, e devolve
+    o PositionIndex com as suas linhas distintas.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    index = PositionIndex(mirror=mirror)
+    for path in paths:
+        for x, o, move in iter_positions(path, chunk_rows):
+            index.add(x, o, move)
+    return index
+
+
+def load_deduplicated(paths, mirror=True, augment=True, chunk_rows=CHUNK_ROWS):
+    """
+    Atalho para build_index(...).to_dataset(augment).
+    Returns:
+        Dataset: Dataset pesado (ver PositionIndex.to_dataset).
+    """
+    return build_index(paths, mirror=mirror, chunk_rows=chunk_rows).to_dataset(augment=augment)
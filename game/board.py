@@ -1,3 +1,5 @@
+import random
+
 # Constantes
 ROWS: int = 6
 COLS: int = 7
@@ -5,50 +7,153 @@ EMPTY: int = 0
 PLAYER_X: int = 1
 PLAYER_O: int = 2
 
+# Layout do bitboard: cada coluna ocupa ROWS + 1 bits (o bit extra é uma
+# sentinela sempre vazia que impede que sequências "passem" de uma coluna
+# para a próxima). Dentro da coluna o bit 0 é a linha de baixo.
+#   bit = coluna * H1 + linha_a_partir_de_baixo
+H1: int = ROWS + 1
+BOTTOM_MASK: int = sum(1 << (c * H1) for c in range(COLS))
+BOARD_MASK: int = BOTTOM_MASK * ((1 << ROWS) - 1)
+
+# Bit da primeira casa e índice "cheio" (primeira sentinela) de cada coluna
+_COLUMN_BASE: tuple[int, ...] = tuple(c * H1 for c in range(COLS))
+_COLUMN_FULL: tuple[int, ...] = tuple(c * H1 + ROWS for c in range(COLS))
+
+# Bit correspondente a cada casa na ordem de to_feature_vector (linha 0 = topo)
+_CELL_BITS: tuple[int, ...] = tuple(
+    c * H1 + (ROWS - 1 - r) for r in range(ROWS) for c in range(COLS)
+)
+
+# Deslocamentos das quatro direções: vertical, horizontal e as duas diagonais
+_DIRECTIONS: tuple[int, ...] = (1, H1, H1 - 1, H1 + 1)
+
+
+# Gera as máscaras das 69 linhas de quatro casas do tabuleiro
+def _all_lines() -> list[int]:
+    lines = []
+    for c in range(COLS):
+        for r in range(ROWS):
+            for dc, dr in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                cells = [(c + i * dc, r + i * dr) for i in range(4)]
+                if all(0 <= cc < COLS and 0 <= rr < ROWS for cc, rr in cells):
+                    lines.append(sum(1 << (cc * H1 + rr) for cc, rr in cells))
+    return lines
+
+
+LINES: tuple[int, ...] = tuple(_all_lines())
+
+# Para cada bit, as linhas de quatro que passam por essa casa
+_CELL_LINES: tuple[tuple[int, ...], ...] = tuple(
+    tuple(line for line in LINES if (line >> bit) & 1) for bit in range(COLS * H1)
+)
+
+
+# Chaves Zobrist: um inteiro aleatório de 64 bits por (jogador, casa).
+# A semente é fixa para que o hash de uma posição seja o mesmo entre processos.
+def _zobrist_keys() -> tuple[tuple[int, ...], ...]:
+    rng = random.Random(0xC0FFEE)
+    return tuple(tuple(rng.getrandbits(64) for _ in range(COLS * H1)) for _ in range(2))
+
+
+ZOBRIST: tuple[tuple[int, ...], ...] = _zobrist_keys()
+
+
+# Verifica se um bitboard contém quatro peças em sequência
+def has_four(bitboard: int) -> bool:
+    for shift in _DIRECTIONS:
+        pairs = bitboard & (bitboard >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+# Verifica se o bitboard completa alguma linha que passa pelo bit indicado
+def wins_at(bitboard: int, bit: int) -> bool:
+    for line in _CELL_LINES[bit]:
+        if bitboard & line == line:
+            return True
+    return False
+
 
 class Board:
 
     #Tabuleiro 7×6 do ConnectFour
+    # O estado é guardado como dois bitboards (um por jogador) e a altura
+    # de cada coluna, o que torna jogadas, cópias e vitórias operações inteiras.
     def __init__(self):
-        self.board: list[list[int]] = [[EMPTY for _ in range(COLS)] for _ in range(ROWS)]
+        self.bitboards: list[int] = [0, 0]
+        self.heights: list[int] = list(_COLUMN_BASE)
         self.current_player: int = PLAYER_X
         self.winner = None
-
+        self.plies: int = 0
+        # Pilha de colunas jogadas, usada por undo_move
+        self.moves: list[int] = []
+        # Hash Zobrist da posição, atualizado a cada jogada
+        self.hash: int = 0
+
+    # Grelha 6×7 (linha 0 = topo) reconstruída a partir dos bitboards
+    @property
+    def board(self) -> list[list[int]]:
+        cells = self.to_feature_vector()
+        return [cells[r * COLS:(r + 1) * COLS] for r in range(ROWS)]
 
     # Devolve as colunas em que ainda tem posições disponíveis
     def valid_moves(self) -> list[int]:
-        return [c for c in range(COLS) if self.board[0][c] == EMPTY]
+        heights = self.heights
+        return [c for c in range(COLS) if heights[c] != _COLUMN_FULL[c]]
 
     # "Solta" peça na coluna
+    # Só as linhas que passam pela peça jogada podem ter formado uma vitória
     def apply_move(self, column: int):
         if column not in range(COLS):
-            print(f"Coluna fora do intervalo 0‑6.")
-        if self.board[0][column] != EMPTY:
-            print(f"Coluna cheia – escolha outra.")
-
-        for row in range(ROWS - 1, -1, -1):
-            if self.board[row][column] == EMPTY:
-                self.board[row][column] = self.current_player
-                break
+            raise ValueError(f"Coluna fora do intervalo 0‑6.")
+        if self.heights[column] == _COLUMN_FULL[column]:
+            raise ValueError(f"Coluna cheia – escolha outra.")
+        if self.winner is not None:
+            raise ValueError(f"Jogo já terminou.")
+
+        bit = self.heights[column]
+        player = self.current_player
+        index = player - 1
+        self.bitboards[index] |= 1 << bit
+        self.hash ^= ZOBRIST[index][bit]
+        self.heights[column] = bit + 1
+        self.plies += 1
+        self.moves.append(column)
         #
-        self.current_player = PLAYER_X if self.current_player == PLAYER_O else PLAYER_O
-        self.winner = self.check_win()
+        self.current_player = PLAYER_X if player == PLAYER_O else PLAYER_O
+        if wins_at(self.bitboards[index], bit):
+            self.winner = player
+
+    # Desfaz a última jogada (make/unmake para a busca não precisar de cópias)
+    def undo_move(self) -> int:
+        column = self.moves.pop()
+        bit = self.heights[column] - 1
+        player = PLAYER_X if self.current_player == PLAYER_O else PLAYER_O
+        self.bitboards[player - 1] &= ~(1 << bit)
+        self.hash ^= ZOBRIST[player - 1][bit]
+        self.heights[column] = bit
+        self.plies -= 1
+        self.current_player = player
+        self.winner = None
+        return column
+
+    # Verifica, sem alterar o tabuleiro, se jogar na coluna dá a vitória ao jogador da vez
+    def is_winning_move(self, column: int) -> bool:
+        bit = self.heights[column]
+        return wins_at(self.bitboards[self.current_player - 1] | (1 << bit), bit)
 
-    # Checa se houve vencedor na ultima rodada
+    # Checa se houve vencedor, varrendo o tabuleiro inteiro
     # None caso nao tenha vencedor
     def check_win(self) -> int | None:
         for player in (PLAYER_X, PLAYER_O):
-            if (
-                self._four_horizontal(player)
-                or self._four_vertical(player)
-                or self._four_diagonal(player)
-            ):
+            if has_four(self.bitboards[player - 1]):
                 return player
         return None
 
     # Devolve se o tabuleiro está cheio
     def is_full(self) -> bool:
-        return all(self.board[0][c] != EMPTY for c in range(COLS))
+        return self.plies == ROWS * COLS
 
     # Devolve se o jogo acabou ou não
     def is_game_over(self):
@@ -64,16 +169,24 @@ class Board:
 
     # Cópia usada pelo Monte Carlo para fazer simulações
     def copy(self) -> "Board":
-        new = Board()
-        new.board = [row[:] for row in self.board]
+        new = Board.__new__(Board)
+        new.bitboards = self.bitboards[:]
+        new.heights = self.heights[:]
         new.current_player = self.current_player
         new.winner = self.winner          # <-- correcção crucial
+        new.plies = self.plies
+        new.moves = self.moves[:]
+        new.hash = self.hash
         return new
 
     # Prepara o tabuleiro para a modelagem da ID3
     def to_feature_vector(self) -> list[int]:
         """Converte o estado em lista 1‑D de 42 inteiros (para ID3)."""
-        return [cell for row in self.board for cell in row]
+        x, o = self.bitboards
+        return [
+            PLAYER_X if (x >> bit) & 1 else PLAYER_O if (o >> bit) & 1 else EMPTY
+            for bit in _CELL_BITS
+        ]
 
     # Constrói o tabuleiro
     def render(self) -> str:
@@ -90,36 +203,3 @@ class Board:
         if not self.is_game_over():
             player_name = "X" if self.current_player == PLAYER_X else "O"
             print(f"Vez do jogador {player_name}")
-
-
-    # Métodos para verificar 4 peças em sequência em todas direções
-    #Checa Horizontal
-    def _four_horizontal(self, player: int) -> bool:
-        for r in range(ROWS):
-            consecutive = 0
-            for c in range(COLS):
-                consecutive = consecutive + 1 if self.board[r][c] == player else 0
-                if consecutive == 4:
-                    return True
-        return False
-    #Checa Vertical
-    def _four_vertical(self, player: int) -> bool:
-        for c in range(COLS):
-            consecutive = 0
-            for r in range(ROWS):
-                consecutive = consecutive + 1 if self.board[r][c] == player else 0
-                if consecutive == 4:
-                    return True
-        return False
-
-    # Checa Diagonais
-    def _four_diagonal(self, player: int) -> bool:
-        for r in range(ROWS - 3):
-            for c in range(COLS - 3):
-                if all(self.board[r + i][c + i] == player for i in range(4)):
-                    return True
-        for r in range(3, ROWS):
-            for c in range(COLS - 3):
-                if all(self.board[r - i][c + i] == player for i in range(4)):
-                    return True
-        return False
\ No newline at end of file
@@ -21,9 +21,13 @@ class Game:
             self.player_names[PLAYER_O] = player_o_name
 
     # Faz o movimento selecionado
+    # Devolve False, sem alterar o tabuleiro, se a jogada for inválida
     def make_move(self, column: int) -> bool:
         # Aplica o movimento
-        self.board.apply_move(column)
+        try:
+            self.board.apply_move(column)
+        except ValueError:
+            return False
 
         # Verificar se o jogo terminou após o movimento
         if self.board.is_game_over():
@@ -1,21 +1,247 @@
-import numpy as np
+import json
+import mmap
+import os
+import pickle
+import struct
 from collections import Counter
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import AsyncResult
+
+import numpy as np
+
+from game.board import COLS, EMPTY, Board
+
+# Formato binário do modelo compilado: cabeçalho fixo, metadados em JSON e os
+# arrays da árvore alinhados a 8 bytes, em little-endian, para serem lidos por mmap
+MODEL_MAGIC = b"ID3M"
+MODEL_VERSION = 1
+MODEL_HEADER = struct.Struct("<4sII")   # magic, versão, tamanho do JSON
+# Arrays gravados depois dos metadados, por esta ordem ("value" tem o tipo indicado nos metadados)
+_MODEL_ARRAYS = ("feature", "left", "right", "label", "value")
+# Colunas dos modelos do jogo (a ordem de Board.to_feature_vector), usadas pelos
+# pickles gravados antes de o ID3Tree guardar feature_names
+FEATURE_NAMES = [f"cell_{i}" for i in range(42)]
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+class CompiledTree:
+    # Árvore ID3 em arrays planos, numerada em pré-ordem (o nó 0 é a raiz).
+    # O nó i testa a coluna feature[i]: se o valor for igual a value[i] segue para
+    # left[i], senão para right[i]. feature[i] == -1 marca uma folha, cuja classe
+    # é classes[label[i]].
+    def __init__(self, feature, value, left, right, label, classes, feature_names, path=None):
+        self.feature = feature
+        self.value = value
+        self.left = left
+        self.right = right
+        self.label = label
+        self.classes = classes
+        self.feature_names = feature_names
+        # Ficheiro de onde o modelo foi lido (os arrays são vistas só de leitura do mmap)
+        self.path = path
+        # Cópias em listas para o caminho de uma só amostra, criadas no primeiro uso
+        self._lists = None
+
+    def __len__(self):
+        return len(self.feature)
+
+    def save(self, path, metadata=None):
+        """
+        Grava o modelo no formato binário (ver load).
+        Args:
+            path (str): Ficheiro de destino.
+            metadata (dict): Informação extra guardada nos metadados (ex.: max_depth).
+        """
+        if self.value.dtype.kind not in "biuf":
+            raise ValueError("O formato binário só suporta valores numéricos nas divisões.")
+        value = self.value.astype(self.value.dtype.newbyteorder("<"))
+        arrays = {
+            "feature": self.feature.astype("<i4"),
+            "left": self.left.astype("<i4"),
+            "right": self.right.astype("<i4"),
+            "label": self.label.astype("<i4"),
+            "value": value,
+        }
+        meta = dict(metadata or {})
+        meta.update(
+            nodes=len(self),
+            value_dtype=value.dtype.str,
+            feature_names=list(self.feature_names),
+            classes=self.classes.tolist(),
+        )
+        meta_bytes = json.dumps(meta).encode("utf-8")
+
+        with open(path, "wb") as f:
+            f.write(MODEL_HEADER.pack(MODEL_MAGIC, MODEL_VERSION, len(meta_bytes)))
+            f.write(meta_bytes)
+            offset = MODEL_HEADER.size + len(meta_bytes)
+            for name in _MODEL_ARRAYS:
+                f.write(b"\0" * (_align(offset) - offset))
+                data = arrays[name].tobytes()
+                f.write(data)
+                offset = _align(offset) + len(data)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Lê um modelo gravado com save. Os arrays não são copiados: são vistas
+        só de leitura sobre o ficheiro mapeado em memória, partilhadas pelo
+        sistema operativo entre todos os processos que abrem o mesmo ficheiro.
+        """
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mm) < MODEL_HEADER.size:
+            raise ValueError(f"{path} não é um modelo ID3.")
+        magic, version, meta_size = MODEL_HEADER.unpack_from(mm, 0)
+        if magic != MODEL_MAGIC:
+            raise ValueError(f"{path} não é um modelo ID3.")
+        if version != MODEL_VERSION:
+            raise ValueError(f"Versão do modelo não suportada: {version}")
+        meta = json.loads(mm[MODEL_HEADER.size:MODEL_HEADER.size + meta_size].decode("utf-8"))
+
+        n = meta["nodes"]
+        dtypes = {"feature": "<i4", "left": "<i4", "right": "<i4", "label": "<i4", "value": meta["value_dtype"]}
+        arrays = {}
+        offset = MODEL_HEADER.size + meta_size
+        for name in _MODEL_ARRAYS:
+            dtype = np.dtype(dtypes[name])
+            offset = _align(offset)
+            if offset + n * dtype.itemsize > len(mm):
+                raise ValueError(f"{path} está truncado.")
+            arrays[name] = np.frombuffer(mm, dtype=dtype, count=n, offset=offset)
+            offset += n * dtype.itemsize
+        return cls(
+            arrays["feature"], arrays["value"], arrays["left"], arrays["right"], arrays["label"],
+            np.array(meta["classes"]), meta["feature_names"], path=path,
+        )
+
+    # Um modelo lido de ficheiro é enviado aos processos filhos só pelo caminho:
+    # cada processo volta a mapear o ficheiro em vez de receber uma cópia dos arrays
+    def __getstate__(self):
+        if self.path is not None:
+            return {"path": self.path}
+        state = self.__dict__.copy()
+        state["_lists"] = None
+        return state
+
+    def __setstate__(self, state):
+        if set(state) == {"path"}:
+            self.__dict__.update(CompiledTree.load(state["path"]).__dict__)
+        else:
+            self.__dict__.update(state)
+
+    def predict(self, X):
+        """
+        Prediz as classes de todas as linhas de uma matriz de uma só vez: em cada
+        passo, todas as amostras que ainda não chegaram a uma folha descem um nível.
+        Args:
+            X (ndarray): Matriz (amostras × colunas), pela ordem de feature_names.
+        Returns:
+            ndarray: Classes previstas.
+        """
+        X = np.asarray(X)
+        nodes = np.zeros(len(X), dtype=np.int32)
+        active = np.arange(len(X))
+        while active.size:
+            current = nodes[active]
+            features = self.feature[current]
+            inner = features >= 0
+            active, current, features = active[inner], current[inner], features[inner]
+            go_left = X[active, features] == self.value[current]
+            nodes[active] = np.where(go_left, self.left[current], self.right[current])
+        return self.classes[self.label[nodes]]
+
+    def predict_one(self, row):
+        """
+        Prediz a classe de uma amostra dada como lista (ou tuplo) de valores.
+        """
+        if self._lists is None:
+            leaves = [self.classes[k] if k >= 0 else None for k in self.label.tolist()]
+            self._lists = (self.feature.tolist(), self.value.tolist(), self.left.tolist(), self.right.tolist(), leaves)
+        feature, value, left, right, leaves = self._lists
+        node = 0
+        while feature[node] >= 0:
+            node = left[node] if row[feature[node]] == value[node] else right[node]
+        return leaves[node]
+
+    def predict_move(self, position):
+        """
+        Jogada prevista para um Board ou para o vetor de Board.to_feature_vector()
+        (modelo treinado com cell_0..cell_41). Se a coluna prevista não for válida,
+        devolve a coluna válida mais central.
+        """
+        if isinstance(position, Board):
+            features = position.to_feature_vector()
+            valid_moves = position.valid_moves()
+        else:
+            features = list(position)
+            # A primeira linha do vetor é a de cima: a coluna está livre se essa casa estiver vazia
+            valid_moves = [col for col in range(COLS) if features[col] == EMPTY]
+
+        prediction = int(self.predict_one(features))
+        if prediction not in valid_moves:
+            prediction = min(valid_moves, key=lambda c: abs(c - COLS // 2))
+        return prediction
+
+
+def load_model(path="id3_model.bin"):
+    """
+    Carrega o modelo do jogo como CompiledTree. Um .bin é lido por mmap
+    (CompiledTree.load); se não existir, lê o pickle com o mesmo nome (.pkl)
+    e compila a árvore.
+    Args:
+        path (str): Modelo binário (.bin) ou pickle de um ID3Tree (.pkl).
+    Returns:
+        CompiledTree: O modelo pronto a prever.
+    """
+    base, ext = os.path.splitext(path)
+    if ext == ".bin":
+        if os.path.exists(path):
+            return CompiledTree.load(path)
+        path = base + ".pkl"
+    with open(path, "rb") as file:
+        model = pickle.load(file)
+    return model.compile(model.feature_names or FEATURE_NAMES)
+
 
 class ID3Tree:
-    def __init__(self, max_depth=None):
+    # Limite de células (amostras × colunas) processadas de uma vez na procura da divisão
+    CHUNK_CELLS = 1 << 20
+    # Colunas do treino, pela ordem (modelos gravados antes de existir ficam com None)
+    feature_names = None
+    # Treino paralelo (valores por omissão também para modelos gravados antes de existir)
+    n_jobs = 1
+    parallel_depth = 3
+    parallel_min_rows = 20000
+
+    def __init__(self, max_depth=None, n_jobs=1, parallel_depth=3, parallel_min_rows=20000):
         """
         Inicializa a árvore de decisão ID3.
         :param max_depth: Profundidade máxima da árvore.
+        :param n_jobs: Número de processos do treino (1 = sequencial, None = todos os núcleos).
+        :param parallel_depth: Profundidade a partir da qual cada subárvore é treinada
+            inteira num processo; acima dela, os histogramas dos nós grandes são
+            calculados em paralelo por blocos de colunas.
+        :param parallel_min_rows: Nós com menos amostras são sempre tratados sem paralelismo.
         """
         self.tree = None
         self.max_depth = max_depth
+        self.n_jobs = n_jobs
+        self.parallel_depth = parallel_depth
+        self.parallel_min_rows = parallel_min_rows
 
     def entropy(self, y):
-        counts = Counter(y)
-        total = len(y)
+        return self._entropy_from_counts(Counter(y).values(), len(y))
+
+    # Entropia a partir das contagens de cada classe, somadas pela ordem dada
+    @staticmethod
+    def _entropy_from_counts(counts, total):
         entropy_value = 0
         
-        for count in counts.values():
+        for count in counts:
             p = count / total
             entropy_value += -p * np.log2(p) if p > 0 else 0
         
@@ -27,62 +253,356 @@ class ID3Tree:
         return gain
     
     def best_split(self, X, y):
+        """
+        Procura a divisão (atributo, valor) com maior ganho de informação.
+        Returns:
+            tuple: ((atributo, valor), (X_esq, y_esq, X_dir, y_dir)) ou (None, None).
+        """
+        self._encode(X, y)
+        try:
+            split = self._best_split(np.arange(len(X)))
+            attr = None if split is None else self._attr(*split)
+        finally:
+            self._release()
+        if attr is None:
+            return None, None
+        left_mask = X[attr[0]] == attr[1]
+        right_mask = ~left_mask
+        return attr, (X[left_mask], y[left_mask], X[right_mask], y[right_mask])
+
+    # Codifica os dados de treino uma única vez: cada coluna passa a índices dos
+    # seus valores distintos (ordenados) numa só matriz de inteiros (uma linha por
+    # coluna, para ler cada atributo de forma contígua), e as classes passam a
+    # índices de self._classes
+    # X pode ser um DataFrame ou uma matriz NumPy (amostras × atributos) com os
+    # nomes das colunas em `feature_names`. Uma matriz de inteiros de 8 bits não
+    # negativos (como a de dataset.Dataset) é usada diretamente como matriz de
+    # códigos, sem cópia: o código de cada valor é o próprio valor.
+    # Com `sample_weight`, cada amostra conta como o seu peso em todas as
+    # contagens (self._weights; None = todas as amostras com peso 1).
+    def _encode(self, X, y, feature_names=None, sample_weight=None):
+        if hasattr(X, 'columns'):
+            self._columns = list(X.columns)
+            columns = [X[col].to_numpy() for col in self._columns]
+        else:
+            X = np.asarray(X)
+            self._columns = list(feature_names) if feature_names is not None else list(range(X.shape[1]))
+            columns = [X[:, i] for i in range(X.shape[1])]
+        n = len(X)
+
+        if not hasattr(X, 'columns') and X.dtype.kind in 'iu' and X.dtype.itemsize == 1 and X.size \
+                and X.min() >= 0:
+            self._n_values = int(X.max()) + 1
+            self._values = [np.arange(self._n_values, dtype=X.dtype)] * len(self._columns)
+            self._codes = X.T.view(np.uint8)
+        else:
+            self._values = [np.unique(col) for col in columns]
+            self._n_values = max((len(v) for v in self._values), default=0)
+            dtype = np.uint8 if self._n_values <= 256 else np.int32
+            self._codes = np.empty((len(self._columns), n), dtype=dtype)
+            for i, col in enumerate(columns):
+                self._codes[i] = np.searchsorted(self._values[i], col)
+
+        labels = np.asarray(y)
+        if labels.dtype.kind in 'iu' and labels.size and labels.min() >= 0 and labels.max() < 1 << 16:
+            # Rótulos inteiros pequenos: tabela de conversão, sem o array int64 de np.unique
+            present = np.bincount(labels) > 0
+            self._classes = np.flatnonzero(present).astype(labels.dtype)
+            lookup = np.cumsum(present) - 1
+            self._y_codes = lookup.astype(np.uint8 if len(self._classes) <= 256 else np.int32)[labels]
+        else:
+            self._classes, self._y_codes = np.unique(labels, return_inverse=True)
+
+        self._weights = None
+        if sample_weight is not None:
+            weights = np.asarray(sample_weight, dtype=np.float64)
+            if weights.shape != (n,):
+                raise ValueError("sample_weight tem de ter um peso por amostra.")
+            if weights.size and weights.min() <= 0:
+                raise ValueError("Os pesos das amostras têm de ser positivos.")
+            self._weights = weights
+
+    # Os dados de treino não ficam no modelo
+    def _release(self):
+        for name in ('_columns', '_values', '_n_values', '_codes', '_classes', '_y_codes', '_weights', '_pool'):
+            self.__dict__.pop(name, None)
+
+    # Estado de que os processos do treino paralelo precisam (os dados já codificados)
+    def _worker_state(self):
+        names = ('max_depth', '_columns', '_values', '_n_values', '_codes', '_classes', '_y_codes', '_weights')
+        return {name: getattr(self, name) for name in names}
+
+    # Histogramas de classes das colunas [start, stop) para as amostras `rows`:
+    # hist[c, v, k] é o nº de amostras (ou a soma dos seus pesos) com valor v na
+    # coluna c e classe k.
+    # É calculado por blocos de colunas para limitar a memória temporária.
+    def _histogram(self, rows, start, stop):
+        y_codes = self._y_codes[rows]
+        weights = self._row_weights(rows)
+        n_values, n_classes = self._n_values, len(self._classes)
+        hist = np.empty((stop - start, n_values, n_classes), dtype=np.int64 if weights is None else np.float64)
+        step = max(1, self.CHUNK_CELLS // max(len(rows), 1))
+        for first in range(start, stop, step):
+            block = self._codes[first:min(first + step, stop)][:, rows]
+            k = len(block)
+            cells = (np.arange(k)[:, None] * n_values + block) * n_classes + y_codes
+            hist[first - start:first - start + k] = np.bincount(
+                cells.ravel(),
+                weights=None if weights is None else np.broadcast_to(weights, cells.shape).ravel(),
+                minlength=k * n_values * n_classes
+            ).reshape(k, n_values, n_classes)
+        return hist
+
+    # Pesos das amostras `rows` (None se o treino não tiver pesos)
+    def _row_weights(self, rows):
+        weights = getattr(self, '_weights', None)
+        return None if weights is None else weights[rows]
+
+    # Nº de amostras `rows`, ou a soma dos seus pesos
+    def _total(self, rows):
+        weights = self._row_weights(rows)
+        return len(rows) if weights is None else weights.sum()
+
+    # Chave do nó na árvore: (nome da coluna, valor original)
+    def _attr(self, col, value):
+        return (self._columns[col], self._values[col][value])
+
+    def _best_split(self, rows):
+        """
+        Melhor divisão das amostras `rows` como (índice da coluna, código do valor), ou None.
+        Os ganhos de todos os candidatos são calculados de uma vez a partir dos
+        histogramas de classes por coluna e valor; os candidatos empatados com o
+        melhor (a menos de erros de arredondamento) são depois reavaliados com a
+        fórmula escalar original, pela ordem original (colunas e valores por ordem
+        de aparecimento), para que a árvore seja exatamente a mesma.
+        """
+        y_codes = self._y_codes[rows]
+        weights = self._row_weights(rows)
+        n_cols = len(self._columns)
+        if len(rows) == 0 or n_cols == 0:
+            return None
+        n = self._total(rows)
+
+        # Nos nós grandes, cada processo calcula os histogramas de um bloco de colunas
+        pool = getattr(self, '_pool', None)
+        if pool is not None and n >= self.parallel_min_rows:
+            bounds = np.linspace(0, n_cols, min(self._jobs, n_cols) + 1).astype(int)
+            parts = [
+                pool.apply_async(_worker_histogram, (rows, start, stop))
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            hist = np.concatenate([part.get() for part in parts])
+        else:
+            hist = self._histogram(rows, 0, n_cols)
+        left_n = hist.sum(axis=2)
+        right_n = n - left_n
+        # Divisões com um dos lados vazio têm ganho exatamente 0 e nunca são escolhidas
+        # (com pesos não inteiros, o lado vazio pode ficar com um resto de arredondamento)
+        valid = (left_n > 0) & (right_n > (0 if weights is None else n * 1e-12))
+        if not valid.any():
+            return None
+
+        parent_entropy = self._entropy_from_codes(y_codes, weights)
+        gains = parent_entropy - (
+            left_n / n * self._entropy_matrix(hist, left_n)
+            + right_n / n * self._entropy_matrix(hist[0].sum(axis=0) - hist, right_n)
+        )
+        gains[~valid] = -np.inf
+        candidates = np.argwhere(valid & (gains >= gains.max() - 1e-9))
+
+        # Ordem original: coluna e depois primeiro aparecimento do valor na coluna
+        first_seen = [int(np.argmax(self._codes[c, rows] == v)) for c, v in candidates]
+        order = sorted(range(len(candidates)), key=lambda i: (candidates[i][0], first_seen[i]))
+
         best_gain = 0
-        best_attr = None
-        best_splits = None 
-        
-        for col in X.columns:
-            values = X[col].unique()
-            for val in values:
-                left_mask = X[col] == val
-                right_mask = ~left_mask
-                
-                y_left, y_right = y[left_mask], y[right_mask]
-                
-                gain = self.info_gain(y, y_left, y_right)
-                
-                if gain > best_gain:
-                    best_gain = gain
-                    best_attr = (col, val)
-                    best_splits = (X[left_mask], y[left_mask], X[right_mask], y[right_mask])
-                    
-        return best_attr, best_splits
+        best = None
+        for i in order:
+            col, value = candidates[i]
+            left_mask = self._codes[col, rows] == value
+            if weights is None:
+                gain = self._exact_gain(parent_entropy, y_codes[left_mask], y_codes[~left_mask], n)
+            else:
+                gain = self._exact_gain(
+                    parent_entropy, y_codes[left_mask], y_codes[~left_mask], n,
+                    weights[left_mask], weights[~left_mask]
+                )
+            if gain > best_gain:
+                best_gain = gain
+                best = (int(col), int(value))
+        return best
+
+    # Entropia de cada linha de contagens (última dimensão = classes)
+    @staticmethod
+    def _entropy_matrix(counts, totals):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = counts / totals[..., None]
+            terms = np.where(p > 0, -p * np.log2(p), 0.0)
+        return terms.sum(axis=-1)
+
+    # Ganho de informação calculado como em info_gain, a partir das classes codificadas.
+    # As classes de cada lado são contadas pela ordem em que aparecem, como o Counter.
+    def _exact_gain(self, parent_entropy, y_left, y_right, total, w_left=None, w_right=None):
+        p = (len(y_left) if w_left is None else w_left.sum()) / total
+        return parent_entropy - (
+            p * self._entropy_from_codes(y_left, w_left) + (1 - p) * self._entropy_from_codes(y_right, w_right)
+        )
+
+    # Com pesos inteiros a entropia é exatamente a das amostras repetidas
+    # tantas vezes quanto o seu peso
+    def _entropy_from_codes(self, y_codes, weights=None):
+        if len(y_codes) == 0:
+            return 0
+        classes, first, counts = np.unique(y_codes, return_index=True, return_counts=True)
+        if weights is None:
+            counts = [int(c) for c in counts[np.argsort(first)]]
+            return self._entropy_from_counts(counts, len(y_codes))
+        sums = np.bincount(y_codes, weights=weights)[classes]
+        counts = [float(c) for c in sums[np.argsort(first)]]
+        return self._entropy_from_counts(counts, weights.sum())
     
-    def build_tree(self, X, y, depth=0):
+    def build_tree(self, X, y, depth=0, feature_names=None, sample_weight=None):
         """
-        Constrói a árvore de decisão recursivamente.
+        Constrói a árvore de decisão.
+        Os dados são codificados uma vez numa matriz de inteiros e a recursão
+        trabalha sobre um único array de índices das amostras, particionado no
+        próprio array em cada divisão, sem cópias de DataFrames por nó.
         Args:
-            X (DataFrame): Atributos das amostras.
-            y (Series): Rótulos das amostras.
+            X (DataFrame ou ndarray): Atributos das amostras.
+            y (Series ou ndarray): Rótulos das amostras.
             depth (int): Profundidade atual.
+            feature_names (list): Nomes das colunas quando X é uma matriz.
+            sample_weight (ndarray): Peso de cada amostra (opcional).
         """
+        self._encode(X, y, feature_names, sample_weight)
+        try:
+            n = len(self._y_codes)
+            rows = np.arange(n, dtype=np.int32 if n < 1 << 31 else np.int64)
+            self._jobs = self.n_jobs or cpu_count()
+            if self._jobs <= 1:
+                return self._build(rows, 0, len(rows), depth)
+            with Pool(self._jobs, initializer=_worker_init, initargs=(self._worker_state(),)) as pool:
+                self._pool = pool
+                return self._resolve(self._build(rows, 0, len(rows), depth))
+        finally:
+            self.__dict__.pop('_jobs', None)
+            self._release()
+
+    # Substitui as subárvores treinadas noutros processos pelo seu resultado
+    def _resolve(self, tree):
+        if isinstance(tree, AsyncResult):
+            return tree.get()
+        if isinstance(tree, dict):
+            (attr, branches), = tree.items()
+            return {attr: {'left': self._resolve(branches['left']), 'right': self._resolve(branches['right'])}}
+        return tree
+
+    # Constrói o nó das amostras rows[lo:hi]
+    def _build(self, rows, lo, hi, depth):
+        node_rows = rows[lo:hi]
+
+        # Treino paralelo: a partir de parallel_depth cada subárvore grande é
+        # entregue a um processo (o resultado é resolvido no fim por _resolve)
+        pool = getattr(self, '_pool', None)
+        if pool is not None and depth >= self.parallel_depth and hi - lo >= self.parallel_min_rows:
+            return pool.apply_async(_worker_subtree, (node_rows.copy(), depth))
+        counts = np.bincount(
+            self._y_codes[node_rows], weights=self._row_weights(node_rows), minlength=len(self._classes)
+        )
+
         # Caso 1: Todos os rótulos são iguais
-        if len(set(y)) == 1:
-            return y.iloc[0]
+        if np.count_nonzero(counts) == 1:
+            return self._classes[self._y_codes[node_rows[0]]]
 
         # Caso 2: Sem mais atributos ou profundidade máxima atingida
-        if X.empty or (self.max_depth is not None and depth >= self.max_depth):
-            return y.mode()[0]
+        # (a moda é a classe mais frequente; em empate, a menor, como Series.mode)
+        if not self._columns or hi == lo or (self.max_depth is not None and depth >= self.max_depth):
+            return self._classes[np.argmax(counts)]
 
         # Escolhe o melhor atributo para dividir
-        attr, splits = self.best_split(X, y)
-        if attr is None:
-            return y.mode()[0]
+        split = self._best_split(node_rows)
+        if split is None:
+            return self._classes[np.argmax(counts)]
+        col, value = split
+
+        # Partição estável: as amostras do ramo esquerdo passam para o início do
+        # intervalo, mantendo a ordem relativa (a ordem de aparecimento conta nos empates)
+        left_mask = self._codes[col, node_rows] == value
+        n_left = int(np.count_nonzero(left_mask))
+        rows[lo:hi] = np.concatenate((node_rows[left_mask], node_rows[~left_mask]))
 
         # Caso 3: Divisão recursiva com controle de profundidade
-        left_branch = self.build_tree(splits[0], splits[1], depth + 1)
-        right_branch = self.build_tree(splits[2], splits[3], depth + 1)
+        left_branch = self._build(rows, lo, lo + n_left, depth + 1)
+        right_branch = self._build(rows, lo + n_left, hi, depth + 1)
 
-        return {attr: {'left': left_branch, 'right': right_branch}}
+        return {self._attr(col, value): {'left': left_branch, 'right': right_branch}}
         
-    def fit(self, X, y):
+    def fit(self, X, y, feature_names=None, sample_weight=None):
         """
         Treina a árvore de decisão com os dados fornecidos.
         Args:
-            X (DataFrame): Atributos das amostras.
-            y (Series): Rótulos das amostras.
+            X (DataFrame ou ndarray): Atributos das amostras.
+            y (Series ou ndarray): Rótulos das amostras.
+            feature_names (list): Nomes das colunas quando X é uma matriz
+                (por omissão, os índices das colunas).
+            sample_weight (ndarray): Peso (positivo) de cada amostra. Com pesos
+                inteiros, uma amostra de peso w equivale a w amostras iguais, por
+                isso um dataset com as linhas repetidas fundidas (ver dedup.py)
+                dá a mesma árvore.
+        """
+        if hasattr(X, 'columns'):
+            self.feature_names = list(X.columns)
+        else:
+            self.feature_names = list(feature_names) if feature_names is not None else list(range(np.shape(X)[1]))
+        self.tree = self.build_tree(X, y, feature_names=self.feature_names, sample_weight=sample_weight)
+
+    def compile(self, feature_names=None):
+        """
+        Converte a árvore treinada em arrays planos (ver CompiledTree).
+        Args:
+            feature_names (list): Colunas da matriz que vai ser prevista, pela ordem;
+                por omissão as do treino.
+        Returns:
+            CompiledTree: Árvore compilada.
         """
-        self.tree = self.build_tree(X, y)
+        feature_names = list(feature_names if feature_names is not None else self.feature_names or [])
+        positions = {name: i for i, name in enumerate(feature_names)}
+        feature, value, left, right, leaves = [], [], [], [], []
+
+        # Percorre a árvore em pré-ordem; os filhos são ligados quando são criados
+        stack = [(self.tree, -1, None)]
+        while stack:
+            subtree, parent, side = stack.pop()
+            node = len(feature)
+            if parent >= 0:
+                (left if side == 'left' else right)[parent] = node
+            left.append(-1)
+            right.append(-1)
+            if isinstance(subtree, dict):
+                (attr, branches), = subtree.items()
+                if attr[0] not in positions:
+                    raise ValueError(f"A coluna {attr[0]!r} não está em feature_names.")
+                feature.append(positions[attr[0]])
+                value.append(attr[1])
+                leaves.append(None)
+                stack.append((branches['right'], node, 'right'))
+                stack.append((branches['left'], node, 'left'))
+            else:
+                feature.append(-1)
+                value.append(0)
+                leaves.append(subtree)
+
+        classes = np.array(list(dict.fromkeys(leaf for leaf in leaves if leaf is not None)))
+        class_index = {c: i for i, c in enumerate(classes.tolist())}
+        label = [-1 if leaf is None else class_index[np.asarray(leaf).tolist()] for leaf in leaves]
+        return CompiledTree(
+            np.array(feature, dtype=np.int32),
+            np.array(value),
+            np.array(left, dtype=np.int32),
+            np.array(right, dtype=np.int32),
+            np.array(label, dtype=np.int32),
+            classes,
+            feature_names,
+        )
 
     def predict_one(self, x, tree):
         """
@@ -113,4 +633,25 @@ class ID3Tree:
         Returns:
             Series: Classes previstas.
         """
-        return X.apply(lambda x: self.predict_one(x, self.tree), axis=1)
+        import pandas as pd
+
+        compiled = self.compile(list(X.columns))
+        return pd.Series(compiled.predict(X.to_numpy()), index=X.index)
+
+
+# Árvore de cada processo do treino paralelo, com os dados codificados do treino
+_worker_tree = None
+
+
+def _worker_init(state):
+    global _worker_tree
+    _worker_tree = ID3Tree.__new__(ID3Tree)
+    _worker_tree.__dict__.update(state)
+
+
+def _worker_histogram(rows, start, stop):
+    return _worker_tree._histogram(rows, start, stop)
+
+
+def _worker_subtree(rows, depth):
+    return _worker_tree._build(rows, 0, len(rows), depth)
@@ -1,35 +1,42 @@
 import os
 import sys
-import pickle
-import pandas as pd
-from ai.mcts import MCTS
 from game.game import Game
 from game.ui import UI
 
+# O MCTS, o livro de aberturas e o ID3 (NumPy) só são importados quando um modo
+# de jogo precisa deles: o jogo entre humanos arranca sem carregar nada disso.
+
 sys.path.append(os.path.join(os.path.dirname(__file__), "ai"))
 
 #Carrega o Modelo treinado
+# Usa o formato binário (id3_model.bin, lido por mmap) se existir; senão lê o
+# pickle antigo e compila a árvore (id3.load_model). Devolve uma CompiledTree.
 def load_id3_model():
-    model_path = os.path.join("id3_model.pkl")
-
-    # Carrega o modelo ID3
-    with open(model_path, "rb") as file:
-        model = pickle.load(file)
-
-    return model
+    from id3 import load_model
+    return load_model(os.path.join("id3_model.bin"))
 
 
 # Lê o Estado do Jogo e com base nesse estado usa o modelo para prever e devolver o melhor movimento
+# (CompiledTree.predict_move, sem pandas: a árvore percorre diretamente as 42 células)
 def id3_ai(game_state, id3_model):
-    board_state = game_state.board.to_feature_vector()
-    board_df = pd.DataFrame([board_state], columns=[f'cell_{i}' for i in range(42)])
-    prediction = id3_model.predict(board_df)
-    return int(prediction[0])
-
-#Instancia o Monte Carlo e com base no estado do board devolve a jogada considerada ótima
-def mcts_ai(game_state):
-    mcts = MCTS(iterations=500)
-    return mcts.best_move(game_state.board)
+    return id3_model.predict_move(game_state.board)
+
+# Pede a jogada ao humano enquanto o Monte Carlo continua a procurar em segundo plano
+# (pondering); quando o humano joga, o MCTS parte da subárvore já explorada.
+# O pondering fica a correr até ao think() seguinte, que o para e desconta os
+# rollouts já feitos; só é parado aqui se a leitura da jogada falhar.
+def human_move_pondering(ui, game_state, session):
+    session.start_pondering(game_state.board)
+    try:
+        return ui.get_move()
+    except BaseException:
+        session.stop_pondering()
+        raise
+
+#Com base no estado do board devolve a jogada considerada ótima pelo Monte Carlo
+# A sessão mantém a árvore entre jogadas, reaproveitando a subárvore jogada
+def mcts_ai(game_state, session):
+    return session.best_move(game_state.board)
 
 
 def main():
@@ -38,9 +45,6 @@ def main():
     Gerencia o fluxo principal do jogo e a interação entre as classes Game e UI.
     """
 
-    # Carregar o modelo ID3
-    id3_model = load_id3_model()
-
     # Inicializar jogo e interface
     game = Game()
     ui = UI(game)
@@ -49,6 +53,16 @@ def main():
     ui.print_welcome()
     mode = ui.get_game_mode()
 
+    # Os motores só são criados (e o modelo ID3 só é carregado) nos modos que os usam
+    if mode in (2, 3):
+        from ai.book import load_book
+        from ai.mcts import MCTS, SearchSession
+        # Usa o livro de aberturas se tiver sido gerado (scripts/build_opening_book.py)
+        mcts_session = SearchSession(MCTS(iterations=500, book=load_book()))
+    if mode == 3:
+        # Carregar o modelo ID3
+        id3_model = load_id3_model()
+
     if mode == 1:  # Humano vs Humano
         agentes = {
             1: ui.get_move,
@@ -56,12 +70,12 @@ def main():
         }
     elif mode == 2:  # Humano vs IA
         agentes = {
-            1: ui.get_move,
-            2: lambda: mcts_ai(game)
+            1: lambda: human_move_pondering(ui, game, mcts_session),
+            2: lambda: mcts_ai(game, mcts_session)
         }
     else:  # IA vs IA
         agentes = {
-            1: lambda: mcts_ai(game),
+            1: lambda: mcts_ai(game, mcts_session),
             2: lambda: id3_ai(game, id3_model)
         }
 
@@ -75,7 +89,8 @@ def main():
         ui.display_game()
         # Solicitar movimento e aplicar diretamente
         move = agentes[game.board.current_player]()
-        game.make_move(move)
+        if not game.make_move(move):
+            ui.show_move_error(f"Coluna {move} inválida.")
 
     ui.display_game()
     print("\nObrigado por jogar Connect Four!")
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+
+# Garante que conseguimos importar os módulos do projeto
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from ai.arena import PLAYERS, parse_player, run_match
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Torneio entre dois motores, em paralelo e com paragem antecipada",
+        epilog=f"Motores: {', '.join(PLAYERS)}; opções como em \"mcts:iterations=300,max_children=4\".",
+    )
+    parser.add_argument("player_a", help="motor avaliado (o Elo é o dele em relação ao B)")
+    parser.add_argument("player_b")
+    parser.add_argument("--games", type=int, default=200, help="número máximo de jogos")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stop", choices=("sprt", "ci", "none"), default="sprt")
+    parser.add_argument("--elo0", type=float, default=0.0, help="Elo de H0 no SPRT")
+    parser.add_argument("--elo1", type=float, default=50.0, help="Elo de H1 no SPRT")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--min-games", type=int, default=10)
+    args = parser.parse_args()
+
+    # Progresso numa só linha, reescrita a cada jogo
+    def progress(result):
+        print(f"\r{result.games} jogos: V/E/D {result.wins}/{result.draws}/{result.losses}, "
+              f"Elo {result.elo:+.1f}", end="", flush=True)
+
+    result = run_match(
+        parse_player(args.player_a), parse_player(args.player_b),
+        games=args.games, workers=args.workers, seed=args.seed,
+        stop=None if args.stop == "none" else args.stop,
+        elo0=args.elo0, elo1=args.elo1, alpha=args.alpha, beta=args.beta,
+        confidence=args.confidence, min_games=args.min_games, progress=progress,
+    )
+    print()
+    print(result.summary())
+    # Código de saída para a integração contínua: 1 se o SPRT aceitou H0
+    return 1 if result.stop_reason == "sprt-h0" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
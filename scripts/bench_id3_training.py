@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import time
+from multiprocessing import cpu_count
+
+import numpy as np
+import pandas as pd
+
+# Garante que conseguimos importar os módulos do projeto
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from id3 import ID3Tree
+
+DATASET = os.path.join(os.path.dirname(__file__), "..", "data", "connect4_dataset.csv")
+
+
+# Dataset sintético `scale` vezes maior: linhas do original sorteadas com reposição
+# e uma fração dos rótulos trocada ao acaso, para a árvore não ficar igual à original
+def synthetic(data: pd.DataFrame, scale: int, noise: float, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(data), len(data) * scale)
+    big = data.iloc[rows].reset_index(drop=True).astype(np.int8)
+    flip = rng.random(len(big)) < noise
+    big.loc[flip, "move"] = rng.integers(0, 7, int(flip.sum())).astype(np.int8)
+    return big
+
+
+# Tempo de treino de uma configuração e a árvore obtida
+def measure(X, y, jobs: int, max_depth: int, parallel_depth: int):
+    start = time.perf_counter()
+    tree = ID3Tree(max_depth=max_depth, n_jobs=jobs, parallel_depth=parallel_depth)
+    tree.fit(X, y)
+    return time.perf_counter() - start, tree.tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de treino do ID3 com o número de núcleos")
+    parser.add_argument("--max-depth", type=int, default=20)
+    parser.add_argument("--parallel-depth", type=int, default=3)
+    parser.add_argument("--scale", type=int, default=100, help="tamanho do dataset sintético (× o original)")
+    parser.add_argument("--noise", type=float, default=0.1, help="fração de rótulos trocados no sintético")
+    parser.add_argument("--max-workers", type=int, default=cpu_count())
+    args = parser.parse_args()
+
+    data = pd.read_csv(DATASET)
+    datasets = [("connect4", data)]
+    if args.scale > 1:
+        datasets.append((f"sintético {args.scale}x", synthetic(data, args.scale, args.noise)))
+
+    counts = sorted({1, *(2 ** i for i in range(1, 8) if 2 ** i <= args.max_workers), args.max_workers})
+    print(f"{'dataset':>16} {'linhas':>9} {'núcleos':>8} {'tempo (s)':>10} {'speedup':>8}")
+    for name, frame in datasets:
+        X, y = frame.iloc[:, :-1], frame.iloc[:, -1]
+        base = reference = None
+        for jobs in counts:
+            elapsed, tree = measure(X, y, jobs, args.max_depth, args.parallel_depth)
+            base = base or elapsed
+            # O treino paralelo tem de dar exatamente a mesma árvore que o sequencial
+            if reference is None:
+                reference = tree
+            same = "" if tree == reference else "  (árvore diferente!)"
+            print(f"{name:>16} {len(frame):>9} {jobs:>8} {elapsed:>10.2f} {base / elapsed:>7.2f}x{same}")
+
+
+if __name__ == "__main__":
+    main()
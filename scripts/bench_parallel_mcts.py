@@ -0,0 +1,60 @@
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import cpu_count
+
+# Garante que conseguimos importar os módulos do projeto
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from ai.mcts import MCTS
+from game.board import Board
+
+# Posições de teste: abertura e meio-jogo
+POSITIONS = [[], [3, 3, 2, 4, 4, 2, 3, 5]]
+
+
+# Mede rollouts por segundo de uma configuração (média das posições de teste)
+# No modo "root" cada worker faz `iterations` rollouts; no modo "tree" o total é `iterations`.
+# Sem paragem antecipada todas as buscas fazem o trabalho todo, e os rollouts
+# contados são os que a busca reporta (last_result.playouts).
+def measure(workers: int, parallel: str, iterations: int, repeats: int) -> float:
+    total_playouts = 0
+    elapsed = 0.0
+    with MCTS(iterations=iterations, workers=workers, parallel=parallel, early_stop=False) as engine:
+        # Aquece o pool de processos para não medir o arranque
+        engine.best_move(Board())
+        for moves in POSITIONS:
+            board = Board()
+            for m in moves:
+                board.apply_move(m)
+            for _ in range(repeats):
+                start = time.perf_counter()
+                engine.best_move(board)
+                elapsed += time.perf_counter() - start
+                total_playouts += engine.last_result.playouts
+    return total_playouts / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalabilidade do MCTS paralelo com o número de núcleos")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=cpu_count())
+    parser.add_argument("--modes", nargs="+", default=["root", "tree"], choices=["root", "tree"])
+    args = parser.parse_args()
+
+    random.seed(0)
+    counts = sorted({1, *(2 ** i for i in range(1, 8) if 2 ** i <= args.max_workers), args.max_workers})
+    print(f"{'modo':>5} {'workers':>8} {'rollouts/s':>12} {'speedup':>8}")
+    for mode in args.modes:
+        base = None
+        for workers in counts:
+            rate = measure(workers, mode, args.iterations, args.repeats)
+            base = base or rate
+            print(f"{mode:>5} {workers:>8} {rate:>12.0f} {rate / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool, cpu_count
+
+# Garante que conseguimos importar os módulos do projeto
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from ai.book import DEFAULT_PATH, canonical_key, write_book
+from ai.mcts import MCTS
+from game.board import COLS, Board
+
+# Motor de cada processo (criado uma vez pelo initializer do pool)
+_engine = None
+
+
+def _init_worker(iterations: int, solver_threshold: int):
+    global _engine
+    _engine = MCTS(iterations=iterations, solver_threshold=solver_threshold)
+
+
+# Todas as posições até `depth` lances, uma por classe de simetria, pela ordem de
+# geração. Devolve {chave canónica: jogadas até à posição}.
+def enumerate_positions(depth: int) -> dict[int, tuple[int, ...]]:
+    positions = {canonical_key(Board())[0]: ()}
+    frontier = [()]
+    for _ in range(depth):
+        next_frontier = []
+        for moves in frontier:
+            board = Board()
+            for m in moves:
+                board.apply_move(m)
+            for col in board.valid_moves():
+                board.apply_move(col)
+                key = canonical_key(board)[0]
+                if key not in positions and not board.is_game_over():
+                    positions[key] = moves + (col,)
+                    next_frontier.append(moves + (col,))
+                board.undo_move()
+        frontier = next_frontier
+    return positions
+
+
+# Procura a jogada de uma posição; a semente depende só da chave, por isso
+# reconstruir o livro dá o mesmo resultado
+def _search(task: tuple[int, tuple[int, ...]]) -> tuple[int, int]:
+    key, moves = task
+    random.seed(key)
+    board = Board()
+    for m in moves:
+        board.apply_move(m)
+    move = _engine.best_move(board)
+    # Guarda a jogada na orientação canónica
+    if canonical_key(board)[1]:
+        move = COLS - 1 - move
+    return key, move
+
+
+# Jogadas já calculadas numa execução anterior (uma linha "chave jogada" por posição)
+def load_progress(path: str) -> dict[int, int]:
+    done: dict[int, int] = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                # Uma linha incompleta no fim é de uma execução interrompida
+                if len(parts) == 2:
+                    done[int(parts[0])] = int(parts[1])
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o livro de aberturas com MCTS em paralelo")
+    parser.add_argument("--depth", type=int, default=4, help="número máximo de lances das posições do livro")
+    parser.add_argument("--iterations", type=int, default=20000, help="simulações MCTS por posição")
+    parser.add_argument("--solver-threshold", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=cpu_count())
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    # O progresso é gravado posição a posição, por isso o script pode ser
+    # interrompido e relançado (também com --depth maior) sem repetir trabalho
+    progress_path = args.out + ".progress"
+    done = load_progress(progress_path)
+    positions = enumerate_positions(args.depth)
+    tasks = [(key, moves) for key, moves in positions.items() if key not in done]
+    print(f"{len(positions)} posições até {args.depth} lances, {len(positions) - len(tasks)} já calculadas.")
+
+    start = time.perf_counter()
+    with open(progress_path, "a") as progress, Pool(
+        args.workers, initializer=_init_worker, initargs=(args.iterations, args.solver_threshold)
+    ) as pool:
+        for idx, (key, move) in enumerate(pool.imap_unordered(_search, tasks), start=1):
+            progress.write(f"{key} {move}\n")
+            progress.flush()
+            done[key] = move
+            if idx % 50 == 0 or idx == len(tasks):
+                rate = idx / (time.perf_counter() - start)
+                print(f"[{time.strftime('%H:%M:%S')}] {idx}/{len(tasks)} posições ({rate:.1f}/s)")
+
+    entries = {key: done[key] for key in positions}
+    write_book(args.out, entries, args.depth)
+    print(f"Livro com {len(entries)} posições gravado em {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+import time
+
+# Garante que conseguimos importar os módulos do projeto
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from shards import SHARD_EXT, export_csv, import_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Converte o dataset entre CSV e shards binários (.c4s); o sentido depende das extensões"
+    )
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--with-outcome", action="store_true",
+                        help="na exportação para CSV, acrescenta a coluna outcome")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.output.endswith(SHARD_EXT) and not args.input.endswith(SHARD_EXT):
+        # Os shards só crescem: a conversão começa sempre de um ficheiro novo
+        if os.path.exists(args.output):
+            os.remove(args.output)
+        rows = import_csv(args.input, args.output)
+    elif args.input.endswith(SHARD_EXT) and not args.output.endswith(SHARD_EXT):
+        rows = export_csv(args.input, args.output, with_outcome=args.with_outcome)
+    else:
+        parser.error(f"Um dos ficheiros tem de ser um shard {SHARD_EXT} e o outro um CSV.")
+    elapsed = time.perf_counter() - start
+    print(f"{rows} posições convertidas para {args.output} "
+          f"({os.path.getsize(args.input)} -> {os.path.getsize(args.output)} bytes, {elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
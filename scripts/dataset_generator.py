@@ -1,25 +1,49 @@
+import argparse
 import csv
+import glob
 import os
+import queue
+import random
 import sys
+import threading
 import time
 from multiprocessing import Pool, cpu_count
-from typing import Optional, List
+from typing import Optional, List, Tuple
+
+import numpy as np
 
 # Garante que conseguimos importar os módulos do projeto
-sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 from game.game import Game
-from ai.mcts import MCTS
+from ai.book import load_book
+from ai.mcts import MCTS, SearchSession
+import shards
+
+# Diretório onde os CSV serão salvos
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+HEADER = [f"cell_{i}" for i in range(42)] + ["move"]
+
+# Motor MCTS de cada processo (criado uma vez pelo initializer do pool)
+_engine: Optional[MCTS] = None
+
+
+def _init_worker(iterations: int, k: Optional[int], book_path: Optional[str]):
+    global _engine
+    book = load_book(book_path) if book_path else None
+    _engine = MCTS(iterations=iterations, max_children=k, book=book)
 
-# Diretório onde o CSV será salvo
-DATA_DIR = os.path.join("../data")
-os.makedirs(DATA_DIR, exist_ok=True)
 
 # Simula uma partida usando Monte Carlo e retorna 42 colunas por linha indicando o movimento escolhido
-# Iterations indica numero de simulaçoes por jogada
-# Max Children indica o limite de filhos por nó
-def generate_game(iterations: int, max_children: Optional[int]) -> List[List[int]]:
-    engine = MCTS(iterations=iterations, max_children=max_children)
+# A semente depende só da semente base e do número do jogo, por isso cada jogo é
+# reprodutível seja qual for o processo que o joga (e um shard refeito fica igual)
+# Os dois jogadores partilham a mesma sessão, que reaproveita a árvore entre jogadas
+# Devolve também o vencedor (None = empate), guardado nos shards binários
+def generate_game(task: Tuple[int, int]) -> Tuple[int, List[List[int]], Optional[int]]:
+    index, seed = task
+    random.seed(f"{seed}:{index}")
+    session = SearchSession(_engine)
     game = Game()
     records: List[List[int]] = []
 
@@ -28,57 +52,226 @@ def generate_game(iterations: int, max_children: Optional[int]) -> List[List[int
         # Busca o estado do Board
         state = game.board.to_feature_vector()
         # Decide o melhor movimento pelo MCTS
-        move = engine.best_move(game.board)
+        move = session.best_move(game.board)
         # Append [estado + movimento] para o CSV
         records.append(state + [move])
         # Executa o movimento e continua simulaçoes
         game.make_move(move)
 
-    return records
+    return index, records, game.board.get_winner()
+
+
+# Caminho do shard com os jogos [first, end) de um dataset (os incompletos têm a extensão .part)
+# Os shards têm a extensão do ficheiro de saída: .csv ou .c4s (formato binário de shards.py)
+def shard_path(out_file: str, first: int, end: int) -> str:
+    base, ext = os.path.splitext(out_file)
+    return os.path.join(DATA_DIR, f"{base}-{first:08d}-{end:08d}{ext}")
+
+
+# Shards já completos de uma execução anterior, como intervalos (first, end) de jogos
+def completed_shards(out_file: str) -> List[Tuple[int, int]]:
+    base, ext = os.path.splitext(out_file)
+    done = []
+    for path in glob.glob(os.path.join(DATA_DIR, f"{base}-*-*{ext}")):
+        parts = os.path.splitext(os.path.basename(path))[0].rsplit("-", 2)
+        if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
+            done.append((int(parts[1]), int(parts[2])))
+    return sorted(done)
+
+
+class ShardWriter(threading.Thread):
+    # Escreve os jogos numa thread própria, para os processos nunca esperarem pelo disco.
+    # Os jogos chegam por ordem e são agrupados de `games_per_shard` em
+    # `games_per_shard` (pelo número do jogo); cada shard é escrito num ficheiro
+    # .part e só recebe o nome final, com o intervalo de jogos que contém, depois
+    # do último jogo do grupo (`shard_ends`). Isso torna a geração retomável:
+    # numa nova execução os jogos dos shards com nome final são saltados.
+    def __init__(self, out_file: str, games_per_shard: int, shard_ends: set, batch_games: int = 50):
+        super().__init__(daemon=True)
+        self.out_file = out_file
+        self.games_per_shard = games_per_shard
+        self.shard_ends = shard_ends
+        self.batch_games = batch_games
+        self.binary = out_file.endswith(shards.SHARD_EXT)
+        self.queue: "queue.Queue[Optional[Tuple[int, List[List[int]], Optional[int]]]]" = queue.Queue(maxsize=1000)
+        self.error: Optional[BaseException] = None
+        self._file = None
+        self._writer = None
+        self._shard = None
+        self._first = None
+        self._part_path = None
 
-# Simula n_games de forma sequencial para gerar o dataset
+    def put(self, index: int, records: List[List[int]], winner: Optional[int]):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((index, records, winner))
+
+    # Termina de escrever o que está na fila e fecha o shard aberto
+    def finish(self):
+        self.queue.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        try:
+            done = False
+            while not done:
+                batch = [self.queue.get()]
+                # Junta o que já estiver à espera para escrever por blocos
+                while batch[-1] is not None and len(batch) < self.batch_games:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is None:
+                    batch.pop()
+                    done = True
+                for index, records, winner in batch:
+                    self._write(index, records, winner)
+            self._close(complete=False)
+        except BaseException as exc:
+            self.error = exc
+
+    def _write(self, index: int, records: List[List[int]], winner: Optional[int]):
+        shard = index // self.games_per_shard
+        if shard != self._shard:
+            self._close(complete=False)
+            self._shard, self._first = shard, index
+            self._part_path = shard_path(self.out_file, index, index) + ".part"
+            if self.binary:
+                self._file = shards.ShardWriter(self._part_path)
+            else:
+                self._file = open(self._part_path, "w", newline="")
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(HEADER)
+        if self.binary:
+            rows = np.array(records, dtype=np.int8)
+            states = rows[:, :shards.CELLS]
+            self._file.write_features(states, rows[:, -1], shards.game_outcomes(states, winner))
+        else:
+            self._writer.writerows(records)
+        if index in self.shard_ends:
+            self._close(complete=True, end=index + 1)
+
+    def _close(self, complete: bool, end: int = 0):
+        if self._file is None:
+            return
+        self._file.close()
+        if complete:
+            os.replace(self._part_path, shard_path(self.out_file, self._first, end))
+        self._file = self._writer = self._shard = self._first = self._part_path = None
+
+
+# Junta os shards completos num único ficheiro (o que é lido pelo treino)
+def merge_shards(out_file: str) -> str:
+    path = os.path.join(DATA_DIR, out_file)
+    if out_file.endswith(shards.SHARD_EXT):
+        if os.path.exists(path):
+            os.remove(path)
+        with shards.ShardWriter(path) as out:
+            for first, end in completed_shards(out_file):
+                shard = shards.Shard.open(shard_path(out_file, first, end))
+                out.write(shard.x, shard.o, shard.move, shard.outcome)
+        return path
+    with open(path, "w", newline="") as out:
+        out.write(",".join(HEADER) + "\n")
+        for first, end in completed_shards(out_file):
+            with open(shard_path(out_file, first, end), newline="") as f:
+                f.readline()
+                for block in iter(lambda: f.read(1 << 20), ""):
+                    out.write(block)
+    return path
+
+
+# Simula n_games em paralelo para gerar o dataset
 def generate_dataset(
     n_games: int = 1000,
     iterations: int = 10000,
     k: Optional[int] = None,
-    out_file: str = "connect4_dataset.csv"
+    out_file: str = "connect4_dataset.csv",
+    seed: int = 0,
+    workers: Optional[int] = None,
+    games_per_shard: int = 1000,
+    book_path: Optional[str] = None
 ) -> None:
     """
     Gera `n_games` partidas de Connect-Four em paralelo usando MCTS,
-    gravando cada par (estado, movimento) em CSV.
+    gravando cada par (estado, movimento) em shards de `games_per_shard` jogos.
+    Os shards são CSV ou, se `out_file` tiver a extensão .c4s, shards binários
+    (shards.py) que guardam também o resultado do jogo.
 
     :param k: número máximo de filhos por nó (None = expansão total)
+    :param seed: semente base; o jogo i usa sempre a mesma semente derivada dela
+    :param workers: número de processos (None = todos os núcleos)
+    :param book_path: livro de aberturas a consultar (None = sem livro)
     """
-    path = os.path.join(DATA_DIR, out_file)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    n_processes = workers or cpu_count()
+
+    # Retoma: salta os jogos dos shards completos e recomeça os incompletos
+    done = set()
+    for first, end in completed_shards(out_file):
+        done.update(range(first, end))
+    base, ext = os.path.splitext(out_file)
+    for part in glob.glob(os.path.join(DATA_DIR, f"{base}-*{ext}.part")):
+        os.remove(part)
+    tarefas = [(i, seed) for i in range(n_games) if i not in done]
+    # Último jogo de cada grupo de games_per_shard, que fecha o shard
+    shard_ends = {}
+    for i, _ in tarefas:
+        shard_ends[i // games_per_shard] = i
+    shard_ends = set(shard_ends.values())
+    if not tarefas:
+        print("Todos os shards já estão completos.")
+        return
+    print(f"Iniciando geração em paralelo com {n_processes} processos: "
+          f"{len(tarefas)} jogos ({n_games - len(tarefas)} já feitos)...")
 
-    # Escrever cabeçalho
-    with open(path, "w", newline="") as f:
-        writer = csv.writer(f)
-        header = [f"cell_{i}" for i in range(42)] + ["move"]
-        writer.writerow(header)
+    writer = ShardWriter(out_file, games_per_shard, shard_ends)
+    writer.start()
+    start = last_report = time.perf_counter()
+    positions = 0
+    with Pool(n_processes, initializer=_init_worker, initargs=(iterations, k, book_path)) as pool:
+        for idx, (index, records, winner) in enumerate(pool.imap(generate_game, tarefas, chunksize=1), start=1):
+            writer.put(index, records, winner)
+            positions += len(records)
 
-    n_processes = cpu_count()
-    pool = Pool(processes=n_processes)
-    print(f"Iniciando geração em paralelo com {n_processes} processos...")
+            now = time.perf_counter()
+            if now - last_report >= 10 or idx == len(tarefas):
+                last_report = now
+                elapsed = now - start
+                rate = idx / elapsed
+                eta = (len(tarefas) - idx) / rate
+                print(f"[{time.strftime('%H:%M:%S')}] completos {idx}/{len(tarefas)} jogos | "
+                      f"{rate:.2f} jogos/s | {positions / elapsed:.1f} posições/s | "
+                      f"fila de escrita {writer.queue.qsize()} | ETA {eta / 60:.1f} min")
+    writer.finish()
+    print(f"Shards salvos em: {DATA_DIR}")
 
-    # Prepara tarefas: cada tupla é (iterations, k)
-    tarefas = [(iterations, k) for _ in range(n_games)]
 
-    for idx, linhas in enumerate(
-        pool.imap(generate_game(), tarefas, chunksize=1),
-        start=1
-    ):
-        with open(path, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerows(linhas)
+def main():
+    parser = argparse.ArgumentParser(description="Gera o dataset de Connect-Four por self-play com MCTS")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=10000, help="simulações MCTS por jogada")
+    parser.add_argument("--k", type=int, default=None, help="máximo de filhos por nó (omissão = sem limite)")
+    parser.add_argument("--out", default="connect4_dataset.csv",
+                        help="ficheiro de saída; com a extensão .c4s os shards são binários")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--games-per-shard", type=int, default=1000)
+    parser.add_argument("--book", default=None, help="livro de aberturas (scripts/build_opening_book.py)")
+    parser.add_argument("--merge", action="store_true", help="no fim, junta os shards em data/<out>")
+    args = parser.parse_args()
 
-        if idx % 100 == 0:
-            print(f"[{time.strftime('%H:%M:%S')}] completos {idx}/{n_games} jogos")
+    generate_dataset(
+        n_games=args.games, iterations=args.iterations, k=args.k, out_file=args.out,
+        seed=args.seed, workers=args.workers, games_per_shard=args.games_per_shard, book_path=args.book
+    )
+    if args.merge:
+        print(f"Dataset salvo em: {merge_shards(args.out)}")
 
-    pool.close()
-    pool.join()
-    print(f"Dataset salvo em: {path}")
 
 if __name__ == "__main__":
     # Exemplo de uso: 1000 jogos, 10000 simulações por jogada, sem limite de expansão
-    generate_dataset(n_games=1000, iterations=10000, max_children=None)
+    main()
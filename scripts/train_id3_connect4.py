@@ -1,49 +1,59 @@
-import pandas as pd
 import numpy as np
 import os, pickle
+from dataset import CHUNK_ROWS, load_dataset
+from dedup import PositionIndex
 from id3 import ID3Tree
 
 
 # Caminho correto para o notebook
-dataset_path = os.path.join("../data/connect4_dataset.csv")
+# Usa o shard binário (connect4_dataset.c4s) se existir, senão o CSV
+dataset_path = os.path.join("../data/connect4_dataset.c4s")
+if not os.path.exists(dataset_path):
+    dataset_path = os.path.join("../data/connect4_dataset.csv")
 
 # Carregar o novo dataset
-data = pd.read_csv(dataset_path)
-print(data.head())
-print(data.info())
+# O CSV é lido por blocos para um cache int8 (connect4_dataset.i8) que é depois
+# mapeado em memória; as execuções seguintes abrem o cache diretamente
+data = load_dataset(dataset_path)
+print(f'{len(data)} amostras, {len(data.feature_names)} atributos, alvo: {data.target}')
+print(data.X[:5])
 
-# Separar características (X) e alvo (y)
-X = data.iloc[:, :-1].values
-y = data.iloc[:, -1].values
-
-# Dividir em treino e teste (80/20)
+# Dividir em treino e teste (80/20), por índices: sem cópias dos dados
 treino_frac = 0.8
-train_size = int(len(X) * treino_frac)
-
-X_train = X[:train_size].copy()
-X_test = X[train_size:].copy()
-y_train = y[:train_size].copy()
-y_test = y[train_size:].copy()
-
-# Garantir que os conjuntos de treino e teste sejam DataFrames e Series
-if isinstance(X_train, pd.DataFrame) == False:
-    X_train = pd.DataFrame(X_train, columns=[f'cell_{i}' for i in range(42)])
-if isinstance(X_test, pd.DataFrame) == False:
-    X_test = pd.DataFrame(X_test, columns=[f'cell_{i}' for i in range(42)])
-if isinstance(y_train, pd.Series) == False:
-    y_train = pd.Series(y_train)
-if isinstance(y_test, pd.Series) == False:
-    y_test = pd.Series(y_test)
-
-print(f'Tamanho do conjunto de treino: {len(X_train)}')
-print(f'Tamanho do conjunto de teste: {len(X_test)}')
+train_idx, test_idx = data.split(treino_frac)
+
+X_train, y_train = data.X[train_idx], data.y[train_idx]
+X_test, y_test = data.X[test_idx], data.y[test_idx]
+w_train = None
+
+# Com deduplicar, as linhas repetidas do treino são fundidas numa só com o nº
+# de ocorrências como peso: a árvore é a mesma que com todas as repetições,
+# mas o treino só vê as distintas. A divisão e o teste continuam a usar as
+# linhas originais, por isso a acurácia é a mesma.
+# Com espelho, as posições do treino são também levadas à forma canónica (a
+# menor entre ela e a sua imagem no espelho) e cada linha é acompanhada da sua
+# imagem: os dados mudam e a árvore treinada já não é a mesma.
+deduplicar = True
+espelho = False
+if deduplicar:
+    index = PositionIndex(mirror=espelho)
+    for start in range(0, len(y_train), CHUNK_ROWS):
+        index.add_features(X_train[start:start + CHUNK_ROWS], y_train[start:start + CHUNK_ROWS])
+    train = index.to_dataset(augment=espelho)
+    X_train, y_train, w_train = train.X, train.y, train.weights
+    tipo = 'canónicas distintas' if espelho else 'distintas'
+    print(f'{index.rows_seen} posições de treino -> {len(index)} linhas {tipo}')
+
+print(f'Tamanho do conjunto de treino: {len(y_train)}')
+print(f'Tamanho do conjunto de teste: {len(y_test)}')
 
 # Treinar a árvore ID3
 id3_tree = ID3Tree(max_depth=20)
-id3_tree.fit(X_train, y_train)
+id3_tree.fit(X_train, y_train, feature_names=data.feature_names, sample_weight=w_train)
 
 # Previsão
-y_pred = id3_tree.predict(X_test)
+compiled = id3_tree.compile()
+y_pred = compiled.predict(X_test)
 
 # Acurácia
 accuracy = np.mean(y_pred == y_test) * 100
@@ -55,4 +65,8 @@ model_path = os.path.join("../id3_model.pkl")
 # Salvando o modelo treinado
 with open(model_path, "wb") as file:
     pickle.dump(id3_tree, file)
-print("Modelo ID3 salvo com sucesso!")
\ No newline at end of file
+print("Modelo ID3 salvo com sucesso!")
+
+# Versão compilada no formato binário, a que o jogo carrega primeiro
+compiled.save(os.path.join("../id3_model.bin"), metadata={"max_depth": id3_tree.max_depth})
+print("Modelo ID3 compilado salvo com sucesso!")
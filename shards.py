@@ -0,0 +1,255 @@
+import os
+import struct
+
+import numpy as np
+
+from dataset import CHUNK_ROWS, Dataset, csv_columns, iter_csv_chunks
+
+# Shards binários de posições de self-play. Cada registo guarda a posição como
+# duas máscaras de 42 bits (peças de X e peças de O), a jogada feita e o
+# resultado final do jogo visto pelo jogador da vez: 18 bytes por posição,
+# em vez dos ~90 de uma linha do CSV.
+# O bit i das máscaras é a célula i de Board.to_feature_vector (linha 0 = topo).
+SHARD_MAGIC = b"C4PS"
+SHARD_VERSION = 1
+SHARD_HEADER = struct.Struct("<4sII")   # magic, versão, bytes por registo
+SHARD_EXT = ".c4s"
+
+RECORD_DTYPE = np.dtype([("x", "<u8"), ("o", "<u8"), ("move", "i1"), ("outcome", "i1")])
+
+CELLS = 42
+FEATURE_NAMES = [f"cell_{i}" for i in range(CELLS)]
+
+# Resultado do jogo para o jogador que vai jogar na posição
+OUTCOME_LOSS = -1
+OUTCOME_DRAW = 0
+OUTCOME_WIN = 1
+# Resultado desconhecido (por exemplo, posições importadas de um CSV sem a coluna outcome)
+OUTCOME_UNKNOWN = -128
+
+_PLAYER_X = 1
+_PLAYER_O = 2
+
+
+def encode_features(features):
+    """
+    Converte posições no formato de Board.to_feature_vector para as duas máscaras.
+    Args:
+        features (np.ndarray): Array (amostras × 42) com 0 (vazio), 1 (X) e 2 (O).
+    Returns:
+        tuple: Arrays uint64 (x, o).
+    """
+    features = np.asarray(features)
+    x = np.zeros(len(features), dtype=np.uint64)
+    o = np.zeros(len(features), dtype=np.uint64)
+    for cell in range(CELLS):
+        column = features[:, cell]
+        x |= (column == _PLAYER_X).astype(np.uint64) << np.uint64(cell)
+        o |= (column == _PLAYER_O).astype(np.uint64) << np.uint64(cell)
+    return x, o
+
+
+def decode_features(x, o, out=None):
+    """
+    Operação inversa de encode_features. O resultado é guardado por coluna
+    (uma linha por célula), como em dataset.Dataset.
+    Args:
+        x, o (np.ndarray): Máscaras uint64.
+        out (np.ndarray): Array int8 (42 × amostras) onde escrever (opcional).
+    Returns:
+        np.ndarray: Array int8 (42 × amostras).
+    """
+    if out is None:
+        out = np.empty((CELLS, len(x)), dtype=np.int8)
+    for cell in range(CELLS):
+        shift = np.uint64(cell)
+        out[cell] = ((x >> shift) & np.uint64(1)) + ((o >> shift) & np.uint64(1)) * np.uint64(2)
+    return out
+
+
+# Resultado de cada posição de um jogo, visto pelo jogador da vez,
+# a partir do vencedor (None = empate). A vez deduz-se do número de peças.
+def game_outcomes(features, winner):
+    features = np.asarray(features)
+    if winner is None:
+        return np.full(len(features), OUTCOME_DRAW, dtype=np.int8)
+    x_to_move = np.count_nonzero(features, axis=1) % 2 == 0
+    winner_to_move = x_to_move if winner == _PLAYER_X else ~x_to_move
+    return np.where(winner_to_move, OUTCOME_WIN, OUTCOME_LOSS).astype(np.int8)
+
+
+def _check_header(head, path):
+    if len(head) < SHARD_HEADER.size:
+        raise ValueError(f"{path} não é um shard de posições.")
+    magic, version, record_size = SHARD_HEADER.unpack(head)
+    if magic != SHARD_MAGIC:
+        raise ValueError(f"{path} não é um shard de posições.")
+    if version != SHARD_VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Versão do shard não suportada: {version}")
+
+
+class ShardWriter:
+    # Escreve posições no fim de um shard (criando-o se não existir).
+    # Só se acrescentam registos inteiros, por isso um shard interrompido a meio
+    # de uma escrita perde apenas o último registo incompleto, que é descartado
+    # quando o shard volta a ser aberto para escrita.
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, "r+b")
+            _check_header(self._file.read(SHARD_HEADER.size), path)
+            size = os.path.getsize(path) - SHARD_HEADER.size
+            self._file.truncate(SHARD_HEADER.size + size // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(SHARD_HEADER.pack(SHARD_MAGIC, SHARD_VERSION, RECORD_DTYPE.itemsize))
+
+    def write(self, x, o, move, outcome=OUTCOME_UNKNOWN):
+        """
+        Acrescenta posições dadas pelas máscaras (escalares ou arrays).
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.uint64))
+        records = np.empty(len(x), dtype=RECORD_DTYPE)
+        records["x"] = x
+        records["o"] = o
+        records["move"] = move
+        records["outcome"] = outcome
+        self._file.write(records.tobytes())
+
+    def write_features(self, features, move, outcome=OUTCOME_UNKNOWN):
+        """
+        Acrescenta posições no formato de Board.to_feature_vector (amostras × 42).
+        """
+        x, o = encode_features(features)
+        self.write(x, o, move, outcome)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Shard:
+    # Leitura de um shard por mmap: `records` é um array estruturado com os
+    # campos x, o, move e outcome, sem cópia dos dados do ficheiro.
+    def __init__(self, records, path=None):
+        self.records = records
+        self.path = path
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def x(self):
+        return self.records["x"]
+
+    @property
+    def o(self):
+        return self.records["o"]
+
+    @property
+    def move(self):
+        return self.records["move"]
+
+    @property
+    def outcome(self):
+        return self.records["outcome"]
+
+    # Posições como (amostras × 42), no formato de Board.to_feature_vector
+    def features(self, start=0, stop=None):
+        records = self.records[start:stop]
+        return decode_features(records["x"], records["o"]).T
+
+    @classmethod
+    def open(cls, path):
+        """
+        Abre um shard escrito por ShardWriter. Um registo incompleto no fim
+        (escrita interrompida) é ignorado.
+        """
+        with open(path, "rb") as f:
+            _check_header(f.read(SHARD_HEADER.size), path)
+        count = (os.path.getsize(path) - SHARD_HEADER.size) // RECORD_DTYPE.itemsize
+        if not count:
+            return cls(np.empty(0, dtype=RECORD_DTYPE), path=path)
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=SHARD_HEADER.size, shape=(count,))
+        return cls(records, path=path)
+
+
+def load_shards(paths, chunk_rows=CHUNK_ROWS):
+    """
+    Junta um ou mais shards num dataset.Dataset (atributos cell_0..cell_41 e alvo move),
+    que pode ser usado diretamente no treino do ID3.
+    Args:
+        paths (str | list): Shard ou lista de shards.
+    Returns:
+        Dataset: Dados descodificados em memória (int8, por coluna).
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    shards = [Shard.open(path) for path in paths]
+    data = np.empty((CELLS + 1, sum(len(shard) for shard in shards)), dtype=np.int8)
+    pos = 0
+    for shard in shards:
+        for start in range(0, len(shard), chunk_rows):
+            records = shard.records[start:start + chunk_rows]
+            end = pos + len(records)
+            decode_features(records["x"], records["o"], out=data[:CELLS, pos:end])
+            data[CELLS, pos:end] = records["move"]
+            pos = end
+    return Dataset(data, FEATURE_NAMES + ["move"], path=paths[0] if len(paths) == 1 else None)
+
+
+def import_csv(csv_path, shard_path, chunk_rows=CHUNK_ROWS):
+    """
+    Converte um CSV (cell_0..cell_41, move e, opcionalmente, outcome) num shard.
+    As linhas são acrescentadas ao shard se ele já existir.
+    Returns:
+        int: Número de posições escritas.
+    """
+    columns = csv_columns(csv_path)
+    missing = [name for name in FEATURE_NAMES + ["move"] if name not in columns]
+    if missing:
+        raise ValueError(f"Faltam colunas em {csv_path}: {', '.join(missing)}")
+    cells = [columns.index(name) for name in FEATURE_NAMES]
+    move = columns.index("move")
+    outcome = columns.index("outcome") if "outcome" in columns else None
+
+    rows = 0
+    with ShardWriter(shard_path) as writer:
+        for chunk in iter_csv_chunks(csv_path, chunk_rows):
+            writer.write_features(
+                chunk[:, cells], chunk[:, move],
+                chunk[:, outcome] if outcome is not None else OUTCOME_UNKNOWN
+            )
+            rows += len(chunk)
+    return rows
+
+
+def export_csv(shard_path, csv_path, with_outcome=False, chunk_rows=CHUNK_ROWS):
+    """
+    Converte um shard no CSV usado até aqui (cell_0..cell_41, move). Com
+    `with_outcome` é acrescentada a coluna outcome.
+    Returns:
+        int: Número de posições escritas.
+    """
+    shard = Shard.open(shard_path)
+    header = FEATURE_NAMES + ["move"] + (["outcome"] if with_outcome else [])
+    with open(csv_path, "w", newline="") as f:
+        f.write(",".join(header) + "\n")
+        for start in range(0, len(shard), chunk_rows):
+            records = shard.records[start:start + chunk_rows]
+            rows = np.empty((len(records), len(header)), dtype=np.int8)
+            decode_features(records["x"], records["o"], out=rows[:, :CELLS].T)
+            rows[:, CELLS] = records["move"]
+            if with_outcome:
+                rows[:, CELLS + 1] = records["outcome"]
+            np.savetxt(f, rows, fmt="%d", delimiter=",")
+    return len(shard)